@@ -7,12 +7,123 @@ This module provides functions for analyzing listening patterns including:
 - Track behavior analytics: skip rates, repeat obsessions, album completion
 """
 
+import contextlib
+import copy
+import functools
+import heapq
+import itertools
+import json
+import pickle
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional, TypedDict
-from collections import defaultdict
+from collections import Counter
 
-from db import get_connection
+from db import (
+    DAILY_STATS_COLUMNS,
+    TIME_RANGE,
+    get_connection,
+    get_read_connection,
+    time_range_params,
+)
+
+
+# Day-level queries read whole days inside the range from the daily_stats
+# rollup and aggregate only the two (possibly partial) edge days from plays.
+# Both take the same two bind values as TIME_RANGE.
+_INNER_DAYS = "date > COALESCE(DATE(?), '') AND date < COALESCE(DATE(?), '9999-12-31')"
+_EDGE_DAYS = "DATE(timestamp) IN (DATE(?), DATE(?))"
+
+# Whole days touched by the range, for pairing with TIME_RANGE so per-day
+# groupings can range-scan idx_plays_date_track in day order. Same two binds.
+_DAY_RANGE = (
+    "DATE(timestamp) >= COALESCE(DATE(?), '') "
+    "AND DATE(timestamp) <= COALESCE(DATE(?), '9999-12-31')"
+)
+
+
+def _daily_totals(*columns: str) -> str:
+    """Subquery of daily_stats counters over a range, for summing in FROM.
+
+    Whole days come straight from the rollup; the edge days are summed from
+    plays with the same per-play expressions the triggers use. Bind
+    time_range_params() * 3.
+    """
+    expressions = dict(DAILY_STATS_COLUMNS)
+    edge_sums = ", ".join(
+        f"SUM({expressions[column].format(row='plays')})" for column in columns
+    )
+    return f"""(
+        SELECT {", ".join(columns)}
+        FROM daily_stats
+        WHERE {_INNER_DAYS}
+        UNION ALL
+        SELECT {edge_sums}
+        FROM plays
+        WHERE {TIME_RANGE} AND {_EDGE_DAYS}
+    )"""
+
+
+@contextlib.contextmanager
+def _read_snapshot():
+    """Yield this thread's shared read connection inside one read transaction.
+
+    Every query in the block sees the same snapshot of the database. Nested
+    uses join the outer transaction, and leaving the outermost block rolls
+    the (read-only) transaction back.
+    """
+    conn = get_read_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+
+
+def _data_version() -> tuple:
+    """Cheap fingerprint of the plays table for invalidating cached results.
+
+    New plays move MAX(id); deletes and changes to timestamps or listening
+    time move the daily_stats totals. Edits to other columns (artist, album,
+    ...) are not detected.
+    """
+    with _read_snapshot() as conn:
+        return tuple(conn.execute(
+            """
+            SELECT
+                (SELECT MAX(id) FROM plays),
+                (SELECT SUM(play_count) FROM daily_stats),
+                (SELECT SUM(total_ms) FROM daily_stats)
+            """
+        ).fetchone())
+
+
+def _cached_analytics(func):
+    """Memoize a self-connecting analytics function per data version.
+
+    Results are keyed on the call arguments, the current _data_version() and
+    today's date (for results relative to "now"). The cache holds each result
+    pickled and every call unpickles a fresh copy, so callers cannot mutate
+    the cached value; for large results (thousands of session dicts) that is
+    several times faster than copy.deepcopy. The version is read in the
+    same snapshot func runs in (its own _read_snapshot() joins the outer
+    one), so a result is never cached under a version older than its data.
+    """
+    @functools.lru_cache(maxsize=64)
+    def cached(version, today, *args, **kwargs):
+        return pickle.dumps(func(*args, **kwargs), pickle.HIGHEST_PROTOCOL)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _read_snapshot():
+            result = cached(_data_version(), date.today(), *args, **kwargs)
+        return pickle.loads(result)
+
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
 
 
 class StreakInfo(TypedDict):
@@ -61,6 +172,50 @@ class HourlyHeatmap(TypedDict):
     quietest_hour_plays: int
 
 
+class Milestone(TypedDict):
+    """Type definition for an achieved milestone."""
+    name: str
+    description: str
+    achieved_date: Optional[str]
+    icon: str
+    category: str
+    threshold: int
+
+
+# Collapse consecutive play dates into streaks: subtracting each date's row
+# number yields a constant anchor date within a run of days.
+_STREAKS_TEMPLATE = """
+    WITH play_dates AS (
+        {play_dates}
+    ),
+    grouped AS (
+        SELECT
+            play_date,
+            DATE(play_date, '-' || ROW_NUMBER() OVER (ORDER BY play_date) || ' days') as grp
+        FROM play_dates
+    )
+    SELECT MIN(play_date) as start, MAX(play_date) as end, COUNT(*) as length
+    FROM grouped
+    GROUP BY grp
+    ORDER BY start ASC
+"""
+
+_STREAKS_SQL = _STREAKS_TEMPLATE.format(play_dates=f"""
+        SELECT date as play_date
+        FROM daily_stats
+        WHERE {_INNER_DAYS}
+        UNION
+        SELECT DATE(timestamp)
+        FROM plays
+        WHERE {TIME_RANGE} AND {_EDGE_DAYS}""")
+
+# Unbounded (all history) is the common call: every day in daily_stats counts,
+# so no range parameters or edge-day lookups against plays are needed.
+_STREAKS_ALL_SQL = _STREAKS_TEMPLATE.format(
+    play_dates="SELECT date as play_date FROM daily_stats"
+)
+
+
 def get_listening_streaks(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -84,27 +239,24 @@ def get_listening_streaks(
             - longest_streak_end: End date of longest streak (ISO format)
             - streak_history: List of all streaks with start, end, and length
     """
-    # Build query to get distinct dates with plays
-    query = """
-        SELECT DISTINCT DATE(timestamp) as play_date
-        FROM plays
-        WHERE 1=1
-    """
-    params = []
-
-    if start_date:
-        query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    query += " ORDER BY play_date ASC"
-
-    cursor = conn.execute(query, params)
-    rows = cursor.fetchall()
-
-    if not rows:
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    if start_date is None and end_date is None:
+        cursor.execute(_STREAKS_ALL_SQL)
+    else:
+        params = time_range_params(start_date, end_date) * 3
+        cursor.execute(_STREAKS_SQL, params)
+    # Build the history and track the longest run in the same pass over the
+    # cursor; the first of several equally long streaks wins
+    streaks = []
+    longest = None
+    for streak_start, streak_end, length in cursor:
+        streak = {"start": streak_start, "end": streak_end, "length": length}
+        streaks.append(streak)
+        if longest is None or streak["length"] > longest["length"]:
+            longest = streak
+
+    if longest is None:
         return StreakInfo(
             current_streak=0,
             longest_streak=0,
@@ -113,47 +265,13 @@ def get_listening_streaks(
             streak_history=[],
         )
 
-    # Convert to date objects
-    dates = [datetime.strptime(row["play_date"], "%Y-%m-%d").date() for row in rows]
-
-    # Find all streaks
-    streaks = []
-    streak_start = dates[0]
-    streak_end = dates[0]
-
-    for i in range(1, len(dates)):
-        if dates[i] - dates[i - 1] == timedelta(days=1):
-            # Continue streak
-            streak_end = dates[i]
-        else:
-            # End current streak, start new one
-            streak_length = (streak_end - streak_start).days + 1
-            streaks.append({
-                "start": streak_start.isoformat(),
-                "end": streak_end.isoformat(),
-                "length": streak_length,
-            })
-            streak_start = dates[i]
-            streak_end = dates[i]
-
-    # Don't forget the last streak
-    streak_length = (streak_end - streak_start).days + 1
-    streaks.append({
-        "start": streak_start.isoformat(),
-        "end": streak_end.isoformat(),
-        "length": streak_length,
-    })
-
-    # Find longest streak
-    longest = max(streaks, key=lambda s: s["length"])
-
     # Calculate current streak (streak that includes today or end_date)
     reference_date = (end_date.date() if end_date else datetime.now().date())
     current_streak = 0
 
     if streaks:
         last_streak = streaks[-1]
-        last_streak_end = datetime.strptime(last_streak["end"], "%Y-%m-%d").date()
+        last_streak_end = date.fromisoformat(last_streak["end"])
         # Current streak if it ends today or yesterday (still active)
         if reference_date - last_streak_end <= timedelta(days=1):
             current_streak = last_streak["length"]
@@ -171,6 +289,55 @@ def get_listening_streaks(
     )
 
 
+# Plays in session order for _iter_sessions. Epoch seconds keep the gap test
+# integer math. The order comes straight from idx_plays_cover; adding id as a
+# tie-break would cost a sort, so plays sharing a timestamp follow that
+# index's order (deterministic, and the original loop had no tie-break).
+_SESSION_PLAYS_SQL = f"""
+    SELECT
+        CAST(strftime('%s', timestamp) AS INTEGER) as epoch,
+        -- effective_ms spelled out: generated columns defeat idx_plays_cover
+        COALESCE(played_ms, duration_ms, 0) as dur,
+        timestamp,
+        title,
+        artist
+    FROM plays
+    WHERE {TIME_RANGE}
+    ORDER BY timestamp
+"""
+
+
+def _iter_sessions(
+    conn: sqlite3.Connection,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    gap_minutes: int,
+):
+    """Yield each listening session as a list of plays, in order.
+
+    Plays are (epoch, dur, timestamp, title, artist) tuples. A new session
+    starts when the next play begins more than gap_minutes after the end
+    (start plus effective length) of the previous one. A single Python pass
+    beats window functions here: SQLite re-sorts the range for every window.
+    """
+    gap_ms = gap_minutes * 60 * 1000
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(_SESSION_PLAYS_SQL, time_range_params(start_date, end_date))
+
+    session = []
+    prev_end_ms = 0
+    for play in cursor:
+        start_ms = play[0] * 1000
+        if session and start_ms - prev_end_ms > gap_ms:
+            yield session
+            session = []
+        session.append(play)
+        prev_end_ms = start_ms + play[1]
+    if session:
+        yield session
+
+
 def get_sessions(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -197,26 +364,25 @@ def get_sessions(
             - longest_session_end: End time of longest session (ISO format)
             - total_listening_minutes: Total listening time across all sessions
     """
-    query = """
-        SELECT timestamp, played_ms, duration_ms
-        FROM plays
-        WHERE 1=1
-    """
-    params = []
-
-    if start_date:
-        query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    query += " ORDER BY timestamp ASC"
-
-    cursor = conn.execute(query, params)
-    rows = cursor.fetchall()
-
-    if not rows:
+    # Fold sessions into running totals as they arrive; only the longest
+    # session's bounds need to be kept. Session length spans first to last
+    # play start, plus the final track.
+    total_sessions = 0
+    total_listening_ms = 0
+    total_duration = 0.0
+    longest_duration = None
+    longest_start = longest_end = None
+    for session in _iter_sessions(conn, start_date, end_date, gap_minutes):
+        first, last = session[0], session[-1]
+        duration = (last[0] - first[0]) / 60 + last[1] / 1000 / 60
+        total_sessions += 1
+        total_listening_ms += sum(play[1] for play in session)
+        total_duration += duration
+        if longest_duration is None or duration > longest_duration:
+            longest_duration = duration
+            longest_start, longest_end = first[2], last[2]
+
+    if not total_sessions:
         return SessionInfo(
             total_sessions=0,
             avg_session_length_minutes=0.0,
@@ -226,74 +392,32 @@ def get_sessions(
             total_listening_minutes=0.0,
         )
 
-    gap_threshold = timedelta(minutes=gap_minutes)
-    sessions = []
-
-    # Start first session
-    current_session_start = datetime.fromisoformat(rows[0]["timestamp"])
-    current_session_end = current_session_start
-    current_session_listening_ms = rows[0]["played_ms"] or rows[0]["duration_ms"] or 0
-
-    for i in range(1, len(rows)):
-        play_time = datetime.fromisoformat(rows[i]["timestamp"])
-        play_duration_ms = rows[i]["played_ms"] or rows[i]["duration_ms"] or 0
-
-        # Calculate gap from end of previous track
-        prev_play_duration = rows[i - 1]["played_ms"] or rows[i - 1]["duration_ms"] or 0
-        prev_end = datetime.fromisoformat(rows[i - 1]["timestamp"]) + timedelta(
-            milliseconds=prev_play_duration
-        )
-        gap = play_time - prev_end
-
-        if gap > gap_threshold:
-            # End current session, start new one
-            session_duration = (current_session_end - current_session_start).total_seconds() / 60
-            session_duration += (current_session_listening_ms / 1000 / 60)  # Add last track
-            sessions.append({
-                "start": current_session_start.isoformat(),
-                "end": current_session_end.isoformat(),
-                "duration_minutes": session_duration,
-                "listening_ms": current_session_listening_ms,
-            })
-            current_session_start = play_time
-            current_session_end = play_time
-            current_session_listening_ms = play_duration_ms
-        else:
-            # Continue session
-            current_session_end = play_time
-            current_session_listening_ms += play_duration_ms
-
-    # Don't forget the last session
-    session_duration = (current_session_end - current_session_start).total_seconds() / 60
-    # For last session, add duration of final track
-    last_track_duration_ms = rows[-1]["played_ms"] or rows[-1]["duration_ms"] or 0
-    session_duration += last_track_duration_ms / 1000 / 60
-    sessions.append({
-        "start": current_session_start.isoformat(),
-        "end": current_session_end.isoformat(),
-        "duration_minutes": session_duration,
-        "listening_ms": current_session_listening_ms,
-    })
-
-    # Calculate statistics
-    total_sessions = len(sessions)
-    total_listening_ms = sum(s["listening_ms"] for s in sessions)
     total_listening_minutes = total_listening_ms / 1000 / 60
-
-    avg_session_length = sum(s["duration_minutes"] for s in sessions) / total_sessions
-
-    longest_session = max(sessions, key=lambda s: s["duration_minutes"])
+    avg_session_length = total_duration / total_sessions
 
     return SessionInfo(
         total_sessions=total_sessions,
-        avg_session_length_minutes=round(avg_session_length, 2),
-        longest_session_minutes=round(longest_session["duration_minutes"], 2),
-        longest_session_start=longest_session["start"],
-        longest_session_end=longest_session["end"],
-        total_listening_minutes=round(total_listening_minutes, 2),
+        avg_session_length_minutes=avg_session_length,
+        longest_session_minutes=longest_duration,
+        longest_session_start=datetime.fromisoformat(longest_start).isoformat(),
+        longest_session_end=datetime.fromisoformat(longest_end).isoformat(),
+        total_listening_minutes=total_listening_minutes,
     )
 
 
+# Totals and night (00:00 - 06:00, local hour_of_day) figures in one scan
+_NIGHT_OWL_SQL = f"""
+    SELECT
+        COUNT(*) as play_count,
+        COALESCE(SUM(effective_ms), 0) as total_ms,
+        COALESCE(SUM(CASE WHEN hour_of_day < 6 THEN 1 ELSE 0 END), 0) as night_plays,
+        COALESCE(SUM(CASE WHEN hour_of_day < 6
+            THEN effective_ms ELSE 0 END), 0) as night_ms
+    FROM plays
+    WHERE {TIME_RANGE}
+"""
+
+
 def get_night_owl_score(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -317,27 +441,11 @@ def get_night_owl_score(
             - night_listening_minutes: Total listening time during night hours
             - total_listening_minutes: Total listening time overall
     """
-    base_query = """
-        SELECT
-            COUNT(*) as play_count,
-            COALESCE(SUM(COALESCE(played_ms, duration_ms, 0)), 0) as total_ms
-        FROM plays
-        WHERE 1=1
-    """
-    params = []
-
-    if start_date:
-        base_query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        base_query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    # Get total plays
-    cursor = conn.execute(base_query, params)
-    total_row = cursor.fetchone()
-    total_plays = total_row["play_count"]
-    total_ms = total_row["total_ms"]
+    params = time_range_params(start_date, end_date)
+    cursor = conn.execute(_NIGHT_OWL_SQL, params)
+    row = cursor.fetchone()
+    total_plays = row["play_count"]
+    total_ms = row["total_ms"]
 
     if total_plays == 0:
         return NightOwlScore(
@@ -348,24 +456,70 @@ def get_night_owl_score(
             total_listening_minutes=0.0,
         )
 
-    # Get night plays (00:00 - 06:00) using local time from hour_of_day column
-    night_query = base_query + " AND hour_of_day IS NOT NULL AND hour_of_day < 6"
-    cursor = conn.execute(night_query, params)
-    night_row = cursor.fetchone()
-    night_plays = night_row["play_count"]
-    night_ms = night_row["total_ms"]
+    night_plays = row["night_plays"]
+    night_ms = row["night_ms"]
 
     night_percentage = (night_plays / total_plays) * 100 if total_plays > 0 else 0
 
     return NightOwlScore(
-        night_owl_percentage=round(night_percentage, 2),
+        night_owl_percentage=night_percentage,
         night_plays=night_plays,
         total_plays=total_plays,
-        night_listening_minutes=round(night_ms / 1000 / 60, 2),
-        total_listening_minutes=round(total_ms / 1000 / 60, 2),
+        night_listening_minutes=night_ms / 1000 / 60,
+        total_listening_minutes=total_ms / 1000 / 60,
     )
 
 
+# Pick the winning day, then rank artists and tracks for that day only
+_BIGGEST_DAY_SQL = f"""
+    WITH day_totals AS (
+        SELECT date as play_date, play_count, total_ms
+        FROM daily_stats
+        WHERE {_INNER_DAYS}
+        UNION ALL
+        SELECT
+            DATE(timestamp),
+            COUNT(*),
+            SUM(effective_ms)
+        FROM plays
+        WHERE {TIME_RANGE} AND {_EDGE_DAYS}
+        GROUP BY DATE(timestamp)
+    ),
+    best_day AS (
+        SELECT play_date, play_count, total_ms
+        FROM day_totals
+        ORDER BY total_ms DESC
+        LIMIT 1
+    ),
+    best_artist AS (
+        SELECT artist
+        FROM plays
+        WHERE DATE(timestamp) = (SELECT play_date FROM best_day) AND artist IS NOT NULL
+        GROUP BY artist
+        ORDER BY COUNT(*) DESC
+        LIMIT 1
+    ),
+    best_track AS (
+        SELECT title, artist
+        FROM plays
+        WHERE DATE(timestamp) = (SELECT play_date FROM best_day)
+        GROUP BY title, artist
+        ORDER BY COUNT(*) DESC
+        LIMIT 1
+    )
+    SELECT
+        d.play_date,
+        d.play_count,
+        d.total_ms,
+        a.artist as top_artist,
+        t.title as top_track_title,
+        t.artist as top_track_artist
+    FROM best_day d
+    LEFT JOIN best_artist a
+    LEFT JOIN best_track t
+"""
+
+
 def get_biggest_listening_day(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -389,73 +543,57 @@ def get_biggest_listening_day(
             - top_track: Most played track on that day
         Returns None if no plays found.
     """
-    query = """
-        SELECT
-            DATE(timestamp) as play_date,
-            COUNT(*) as play_count,
-            SUM(COALESCE(played_ms, duration_ms, 0)) as total_ms
-        FROM plays
-        WHERE 1=1
-    """
-    params = []
-
-    if start_date:
-        query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    query += " GROUP BY play_date ORDER BY total_ms DESC LIMIT 1"
-
-    cursor = conn.execute(query, params)
+    params = time_range_params(start_date, end_date) * 3
+    cursor = conn.execute(_BIGGEST_DAY_SQL, params)
     row = cursor.fetchone()
 
     if not row:
         return None
 
     biggest_date = row["play_date"]
+    top_artist = row["top_artist"]
 
-    # Get top artist for that day
-    artist_query = """
-        SELECT artist, COUNT(*) as cnt
-        FROM plays
-        WHERE DATE(timestamp) = ? AND artist IS NOT NULL
-        GROUP BY artist
-        ORDER BY cnt DESC
-        LIMIT 1
-    """
-    cursor = conn.execute(artist_query, [biggest_date])
-    artist_row = cursor.fetchone()
-    top_artist = artist_row["artist"] if artist_row else None
-
-    # Get top track for that day
-    track_query = """
-        SELECT title, artist, COUNT(*) as cnt
-        FROM plays
-        WHERE DATE(timestamp) = ?
-        GROUP BY title, artist
-        ORDER BY cnt DESC
-        LIMIT 1
-    """
-    cursor = conn.execute(track_query, [biggest_date])
-    track_row = cursor.fetchone()
     top_track = None
-    if track_row:
-        if track_row["artist"]:
-            top_track = f"{track_row['artist']} - {track_row['title']}"
+    if row["top_track_title"] is not None:
+        if row["top_track_artist"]:
+            top_track = f"{row['top_track_artist']} - {row['top_track_title']}"
         else:
-            top_track = track_row["title"]
+            top_track = row["top_track_title"]
 
     return BiggestDay(
         date=biggest_date,
         play_count=row["play_count"],
-        listening_minutes=round(row["total_ms"] / 1000 / 60, 2),
+        listening_minutes=row["total_ms"] / 1000 / 60,
         top_artist=top_artist,
         top_track=top_track,
     )
 
 
+# Fill in silent hours so they can rank as the quietest, then rank the
+# 24 buckets both ways (earliest hour wins ties)
+_HOURLY_HEATMAP_SQL = f"""
+    WITH RECURSIVE all_hours(hour) AS (
+        SELECT 0
+        UNION ALL
+        SELECT hour + 1 FROM all_hours WHERE hour < 23
+    ),
+    counts AS (
+        SELECT hour_of_day as hour, COUNT(*) as play_count
+        FROM plays
+        WHERE hour_of_day IS NOT NULL AND {TIME_RANGE}
+        GROUP BY hour_of_day
+    )
+    SELECT
+        h.hour,
+        COALESCE(c.play_count, 0) as play_count,
+        ROW_NUMBER() OVER (ORDER BY COALESCE(c.play_count, 0) DESC, h.hour) as peak_rank,
+        ROW_NUMBER() OVER (ORDER BY COALESCE(c.play_count, 0) ASC, h.hour) as quiet_rank
+    FROM all_hours h
+    LEFT JOIN counts c ON c.hour = h.hour
+    ORDER BY h.hour
+"""
+
+
 def get_hourly_heatmap(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -479,44 +617,18 @@ def get_hourly_heatmap(
             - quietest_hour: Hour with fewest plays
             - quietest_hour_plays: Play count during quietest hour
     """
-    query = """
-        SELECT
-            hour_of_day as hour,
-            COUNT(*) as play_count
-        FROM plays
-        WHERE hour_of_day IS NOT NULL
-    """
-    params = []
-
-    if start_date:
-        query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    query += " GROUP BY hour_of_day ORDER BY hour_of_day"
+    params = time_range_params(start_date, end_date)
+    cursor = conn.execute(_HOURLY_HEATMAP_SQL, params)
 
-    cursor = conn.execute(query, params)
-    rows = cursor.fetchall()
-
-    # Initialize all hours to 0
-    hours = {h: 0 for h in range(24)}
-
-    for row in rows:
+    hours = {}
+    for row in cursor:
         hours[row["hour"]] = row["play_count"]
-
-    # Find peak and quietest hours
-    if any(hours.values()):
-        peak_hour = max(hours, key=hours.get)
-        peak_hour_plays = hours[peak_hour]
-        quietest_hour = min(hours, key=hours.get)
-        quietest_hour_plays = hours[quietest_hour]
-    else:
-        peak_hour = 0
-        peak_hour_plays = 0
-        quietest_hour = 0
-        quietest_hour_plays = 0
+        if row["peak_rank"] == 1:
+            peak_hour = row["hour"]
+            peak_hour_plays = row["play_count"]
+        if row["quiet_rank"] == 1:
+            quietest_hour = row["hour"]
+            quietest_hour_plays = row["play_count"]
 
     return HourlyHeatmap(
         hours=hours,
@@ -551,6 +663,7 @@ class AlbumListeningPattern(TypedDict):
     sequential_percentage: float
 
 
+@_cached_analytics
 def get_listening_sessions(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -574,102 +687,69 @@ def get_listening_sessions(
             - track_count: Number of tracks played in the session
             - artists: List of unique artists played in the session
     """
-    conn = get_connection()
-    try:
-        query = """
-            SELECT timestamp, played_ms, duration_ms, artist
-            FROM plays
-            WHERE 1=1
-        """
-        params = []
-
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date.isoformat())
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date.isoformat())
-
-        query += " ORDER BY timestamp ASC"
-
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
-
-        if not rows:
-            return []
-
-        gap_threshold = timedelta(minutes=gap_minutes)
-        sessions: list[ListeningSession] = []
-
-        # Start first session
-        current_session_start = datetime.fromisoformat(rows[0]["timestamp"])
-        current_session_end = current_session_start
-        current_session_tracks = 1
-        current_session_artists: set[str] = set()
-        if rows[0]["artist"]:
-            current_session_artists.add(rows[0]["artist"])
-        current_session_listening_ms = rows[0]["played_ms"] or rows[0]["duration_ms"] or 0
-
-        for i in range(1, len(rows)):
-            play_time = datetime.fromisoformat(rows[i]["timestamp"])
-            play_duration_ms = rows[i]["played_ms"] or rows[i]["duration_ms"] or 0
-
-            # Calculate gap from end of previous track
-            prev_play_duration = rows[i - 1]["played_ms"] or rows[i - 1]["duration_ms"] or 0
-            prev_end = datetime.fromisoformat(rows[i - 1]["timestamp"]) + timedelta(
-                milliseconds=prev_play_duration
+    with _read_snapshot() as conn:
+        # Each play row carries its own copy of the artist string; pool them
+        # so each artist name is held once no matter how many sessions list it
+        artist_pool: dict[str, str] = {}
+
+        return [
+            ListeningSession(
+                start_time=datetime.fromisoformat(session[0][2]).isoformat(),
+                end_time=datetime.fromisoformat(session[-1][2]).isoformat(),
+                duration_minutes=round(
+                    (session[-1][0] - session[0][0]) / 60 + session[-1][1] / 1000 / 60, 2
+                ),
+                track_count=len(session),
+                artists=sorted({
+                    artist_pool.setdefault(play[4], play[4]) for play in session if play[4]
+                }),
             )
-            gap = play_time - prev_end
-
-            if gap > gap_threshold:
-                # End current session, start new one
-                session_duration = (current_session_end - current_session_start).total_seconds() / 60
-                # Add duration of last track in session
-                last_track_ms = rows[i - 1]["played_ms"] or rows[i - 1]["duration_ms"] or 0
-                session_duration += last_track_ms / 1000 / 60
-
-                sessions.append(ListeningSession(
-                    start_time=current_session_start.isoformat(),
-                    end_time=current_session_end.isoformat(),
-                    duration_minutes=round(session_duration, 2),
-                    track_count=current_session_tracks,
-                    artists=sorted(list(current_session_artists)),
-                ))
-
-                # Start new session
-                current_session_start = play_time
-                current_session_end = play_time
-                current_session_tracks = 1
-                current_session_artists = set()
-                if rows[i]["artist"]:
-                    current_session_artists.add(rows[i]["artist"])
-                current_session_listening_ms = play_duration_ms
-            else:
-                # Continue session
-                current_session_end = play_time
-                current_session_tracks += 1
-                if rows[i]["artist"]:
-                    current_session_artists.add(rows[i]["artist"])
-                current_session_listening_ms += play_duration_ms
-
-        # Don't forget the last session
-        session_duration = (current_session_end - current_session_start).total_seconds() / 60
-        last_track_ms = rows[-1]["played_ms"] or rows[-1]["duration_ms"] or 0
-        session_duration += last_track_ms / 1000 / 60
-
-        sessions.append(ListeningSession(
-            start_time=current_session_start.isoformat(),
-            end_time=current_session_end.isoformat(),
-            duration_minutes=round(session_duration, 2),
-            track_count=current_session_tracks,
-            artists=sorted(list(current_session_artists)),
-        ))
+            for session in _iter_sessions(conn, start_date, end_date, gap_minutes)
+        ]
 
-        return sessions
-    finally:
-        conn.close()
 
+# Skip and completion figures over plays with usable duration data, from the
+# daily_stats counters: a skip is under half the track played, a full listen
+# is >= 90%
+_PLAY_COMPLETION_SQL = f"""
+    SELECT
+        COALESCE(SUM(rated_plays), 0) as total_plays,
+        COALESCE(SUM(half_skips), 0) as skipped_plays,
+        SUM(completion_sum) / SUM(rated_plays) as average_completion,
+        COALESCE(SUM(full_listens), 0) as full_completions
+    FROM {_daily_totals("rated_plays", "half_skips", "completion_sum", "full_listens")}
+"""
 
+# The skip predicate matches idx_plays_skip's WHERE exactly, so only skipped
+# plays are read
+_MOST_SKIPPED_SQL = f"""
+    SELECT
+        COALESCE(NULLIF(title, ''), 'Unknown') as title,
+        COALESCE(NULLIF(artist, ''), 'Unknown') as artist,
+        COUNT(*) as skip_count
+    FROM plays
+    WHERE played_ms IS NOT NULL AND duration_ms IS NOT NULL AND duration_ms > 0
+      AND played_ms * 1.0 / duration_ms < 0.5
+      AND {TIME_RANGE}
+    GROUP BY 1, 2
+    ORDER BY skip_count DESC, MIN(timestamp)
+    LIMIT 10
+"""
+
+
+@_cached_analytics
+def _play_completion_totals(
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> dict:
+    """Shared totals behind get_behavior_skip_rate and get_completion_rate."""
+    with _read_snapshot() as conn:
+        return dict(conn.execute(
+            _PLAY_COMPLETION_SQL, time_range_params(start_date, end_date) * 3
+        ).fetchone())
+
+
+@_cached_analytics
 def get_behavior_skip_rate(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -687,63 +767,35 @@ def get_behavior_skip_rate(
             - skipped_plays: Number of plays that were skipped
             - most_skipped_tracks: List of most frequently skipped tracks
     """
-    conn = get_connection()
-    try:
-        query = """
-            SELECT title, artist, played_ms, duration_ms
-            FROM plays
-            WHERE played_ms IS NOT NULL AND duration_ms IS NOT NULL AND duration_ms > 0
-        """
-        params = []
-
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date.isoformat())
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date.isoformat())
-
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {
-                "skip_rate": 0.0,
-                "total_plays": 0,
-                "skipped_plays": 0,
-                "most_skipped_tracks": [],
-            }
-
-        skipped_count = 0
-        skip_counts: dict[tuple[str, str], int] = defaultdict(int)
+    totals = _play_completion_totals(start_date, end_date)
+    total_plays = totals["total_plays"]
 
-        for row in rows:
-            completion_ratio = row["played_ms"] / row["duration_ms"]
-            if completion_ratio < 0.5:
-                skipped_count += 1
-                key = (row["title"] or "Unknown", row["artist"] or "Unknown")
-                skip_counts[key] += 1
+    if not total_plays:
+        return {
+            "skip_rate": 0.0,
+            "total_plays": 0,
+            "skipped_plays": 0,
+            "most_skipped_tracks": [],
+        }
 
-        total_plays = len(rows)
-        skip_rate = (skipped_count / total_plays) * 100 if total_plays > 0 else 0
+    skipped_count = totals["skipped_plays"]
+    skip_rate = (skipped_count / total_plays) * 100
 
-        # Get most skipped tracks
-        most_skipped = sorted(
-            [{"title": k[0], "artist": k[1], "skip_count": v} for k, v in skip_counts.items()],
-            key=lambda x: x["skip_count"],
-            reverse=True,
-        )[:10]
+    with _read_snapshot() as conn:
+        most_skipped = [
+            dict(row)
+            for row in conn.execute(_MOST_SKIPPED_SQL, time_range_params(start_date, end_date))
+        ]
 
-        return {
-            "skip_rate": round(skip_rate, 2),
-            "total_plays": total_plays,
-            "skipped_plays": skipped_count,
-            "most_skipped_tracks": most_skipped,
-        }
-    finally:
-        conn.close()
+    return {
+        "skip_rate": round(skip_rate, 2),
+        "total_plays": total_plays,
+        "skipped_plays": skipped_count,
+        "most_skipped_tracks": most_skipped,
+    }
 
 
+@_cached_analytics
 def get_completion_rate(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -761,57 +813,26 @@ def get_completion_rate(
             - full_completions: Number of plays where >= 90% was played
             - partial_plays: Number of plays where < 90% was played
     """
-    conn = get_connection()
-    try:
-        query = """
-            SELECT played_ms, duration_ms
-            FROM plays
-            WHERE played_ms IS NOT NULL AND duration_ms IS NOT NULL AND duration_ms > 0
-        """
-        params = []
-
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date.isoformat())
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date.isoformat())
-
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {
-                "average_completion": 0.0,
-                "total_plays": 0,
-                "full_completions": 0,
-                "partial_plays": 0,
-            }
-
-        completion_percentages = []
-        full_completions = 0
-        partial_plays = 0
-
-        for row in rows:
-            ratio = min(row["played_ms"] / row["duration_ms"], 1.0)
-            completion_percentages.append(ratio * 100)
-            if ratio >= 0.9:
-                full_completions += 1
-            else:
-                partial_plays += 1
-
-        avg_completion = sum(completion_percentages) / len(completion_percentages)
+    totals = _play_completion_totals(start_date, end_date)
+    total_plays = totals["total_plays"]
 
+    if not total_plays:
         return {
-            "average_completion": round(avg_completion, 2),
-            "total_plays": len(rows),
-            "full_completions": full_completions,
-            "partial_plays": partial_plays,
+            "average_completion": 0.0,
+            "total_plays": 0,
+            "full_completions": 0,
+            "partial_plays": 0,
         }
-    finally:
-        conn.close()
+
+    return {
+        "average_completion": round(totals["average_completion"], 2),
+        "total_plays": total_plays,
+        "full_completions": totals["full_completions"],
+        "partial_plays": total_plays - totals["full_completions"],
+    }
 
 
+@_cached_analytics
 def get_repeat_plays(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -830,65 +851,70 @@ def get_repeat_plays(
             - total_repeats: Total number of repeat plays
             - sessions_with_repeats: Number of sessions containing repeats
     """
-    # Get all sessions first
-    sessions = get_listening_sessions(start_date, end_date)
-
-    conn = get_connection()
-    try:
-        repeat_tracks: dict[tuple[str, str], dict] = defaultdict(
-            lambda: {"repeat_count": 0, "sessions_with_repeats": 0}
-        )
+    with _read_snapshot() as conn:
+        # (title, artist) -> [repeat_count, sessions_with_repeats, first session]
+        repeat_tracks: dict[tuple[str, str], list[int]] = {}
         total_repeats = 0
         sessions_with_repeats = 0
 
-        for session in sessions:
-            session_start = session["start_time"]
-            session_end = session["end_time"]
+        sessions = _iter_sessions(conn, start_date, end_date, gap_minutes=30)
+        for session_index, session in enumerate(sessions):
+            if len(session) < 2:
+                continue
+            repeated_in_session = False
+            for (title, artist), play_count in Counter(
+                (play[3], play[4]) for play in session
+            ).items():
+                if play_count < 2:
+                    continue
+                repeated_in_session = True
+                repeats = play_count - 1  # First play isn't a repeat
+                key = (title or "Unknown", artist or "Unknown")
+                track = repeat_tracks.setdefault(key, [0, 0, session_index])
+                track[0] += repeats
+                track[1] += 1
+                total_repeats += repeats
+            sessions_with_repeats += repeated_in_session
+
+    # Most repeats first; ties go to the track repeated earliest
+    ranked = sorted(
+        repeat_tracks.items(),
+        key=lambda item: (-item[1][0], item[1][2], item[0]),
+    )[:20]
 
-            # Get tracks in this session
-            query = """
-                SELECT title, artist, COUNT(*) as play_count
-                FROM plays
-                WHERE timestamp >= ? AND timestamp <= ?
-                GROUP BY title, artist
-                HAVING COUNT(*) > 1
-            """
-            cursor = conn.execute(query, [session_start, session_end])
-            repeated_in_session = cursor.fetchall()
-
-            if repeated_in_session:
-                sessions_with_repeats += 1
-                for row in repeated_in_session:
-                    key = (row["title"] or "Unknown", row["artist"] or "Unknown")
-                    repeats = row["play_count"] - 1  # First play isn't a repeat
-                    repeat_tracks[key]["repeat_count"] += repeats
-                    repeat_tracks[key]["sessions_with_repeats"] += 1
-                    total_repeats += repeats
-
-        # Format results
-        repeat_list = sorted(
-            [
-                {
-                    "title": k[0],
-                    "artist": k[1],
-                    "repeat_count": v["repeat_count"],
-                    "sessions_with_repeats": v["sessions_with_repeats"],
-                }
-                for k, v in repeat_tracks.items()
-            ],
-            key=lambda x: x["repeat_count"],
-            reverse=True,
-        )
+    return {
+        "repeat_tracks": [
+            {
+                "title": title,
+                "artist": artist,
+                "repeat_count": repeat_count,
+                "sessions_with_repeats": sessions,
+            }
+            for (title, artist), (repeat_count, sessions, _) in ranked
+        ],
+        "total_repeats": total_repeats,
+        "sessions_with_repeats": sessions_with_repeats,
+    }
 
-        return {
-            "repeat_tracks": repeat_list[:20],
-            "total_repeats": total_repeats,
-            "sessions_with_repeats": sessions_with_repeats,
-        }
-    finally:
-        conn.close()
 
+# Pair each play in the range with its artist's first-ever play time,
+# computed once per artist, instead of probing plays again per row
+_DISCOVERY_SQL = f"""
+    WITH first_plays AS (
+        SELECT artist, MIN(timestamp) as first_ts
+        FROM plays
+        WHERE artist IS NOT NULL
+        GROUP BY artist
+    )
+    SELECT p.timestamp, p.artist, p.timestamp = f.first_ts as is_first
+    FROM plays p
+    JOIN first_plays f ON f.artist = p.artist
+    WHERE {TIME_RANGE}
+    ORDER BY p.timestamp ASC
+"""
 
+
+@_cached_analytics
 def get_behavior_discovery_rate(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -909,54 +935,22 @@ def get_behavior_discovery_rate(
             - first_time_plays: Number of plays that were first-time artists
             - new_artists: List of newly discovered artists
     """
-    conn = get_connection()
-    try:
-        # Build query for plays in the date range
-        query = """
-            SELECT timestamp, artist
-            FROM plays
-            WHERE artist IS NOT NULL
-        """
-        params = []
-
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date.isoformat())
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date.isoformat())
-
-        query += " ORDER BY timestamp ASC"
-
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {
-                "discovery_rate": 0.0,
-                "total_plays": 0,
-                "first_time_plays": 0,
-                "new_artists": [],
-            }
-
-        # For each play, check if the artist had any plays before this one
+    with _read_snapshot() as conn:
+        # Plain tuples: this loop runs once per play in the range
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(_DISCOVERY_SQL, time_range_params(start_date, end_date))
+
+        # A play is first-time when no earlier play of its artist exists,
+        # i.e. it falls on the artist's first timestamp
+        total_plays = 0
         first_time_plays = 0
         new_artists: list[dict] = []
         seen_new_artists: set[str] = set()
 
-        for row in rows:
-            artist = row["artist"]
-            play_time = row["timestamp"]
-
-            # Check if this artist has any plays before this timestamp
-            check_query = """
-                SELECT COUNT(*) as count FROM plays
-                WHERE artist = ? AND timestamp < ?
-            """
-            check_cursor = conn.execute(check_query, [artist, play_time])
-            previous_plays = check_cursor.fetchone()["count"]
-
-            if previous_plays == 0:
+        for play_time, artist, is_first in cursor:
+            total_plays += 1
+            if is_first:
                 first_time_plays += 1
                 if artist not in seen_new_artists:
                     seen_new_artists.add(artist)
@@ -965,8 +959,15 @@ def get_behavior_discovery_rate(
                         "first_play": play_time,
                     })
 
-        total_plays = len(rows)
-        discovery_rate = (first_time_plays / total_plays) * 100 if total_plays > 0 else 0
+        if not total_plays:
+            return {
+                "discovery_rate": 0.0,
+                "total_plays": 0,
+                "first_time_plays": 0,
+                "new_artists": [],
+            }
+
+        discovery_rate = (first_time_plays / total_plays) * 100
 
         return {
             "discovery_rate": round(discovery_rate, 2),
@@ -974,10 +975,47 @@ def get_behavior_discovery_rate(
             "first_time_plays": first_time_plays,
             "new_artists": new_artists,
         }
-    finally:
-        conn.close()
 
 
+# Compare each album play with the previous play of the same album: it is
+# sequential when within 15 minutes and, if both have track numbers, the
+# next track. Albums come back in order of first appearance.
+_ALBUM_PATTERNS_SQL = f"""
+    WITH album_plays AS (
+        SELECT
+            id,
+            album,
+            COALESCE(NULLIF(artist, ''), 'Unknown') as artist,
+            track_number,
+            CAST(strftime('%s', timestamp) AS INTEGER) as epoch
+        FROM plays
+        WHERE album IS NOT NULL AND album != '' AND {TIME_RANGE}
+    ),
+    compared AS (
+        SELECT
+            *,
+            LAG(epoch) OVER w as prev_epoch,
+            LAG(track_number) OVER w as prev_track
+        FROM album_plays
+        WINDOW w AS (PARTITION BY album, artist ORDER BY epoch, id)
+    )
+    SELECT
+        album,
+        artist,
+        COUNT(*) as total_plays,
+        SUM(
+            prev_epoch IS NOT NULL
+            AND epoch - prev_epoch <= 15 * 60
+            AND (prev_track IS NULL OR track_number IS NULL OR track_number = prev_track + 1)
+        ) as sequential_plays
+    FROM compared
+    GROUP BY album, artist
+    HAVING COUNT(*) >= 2
+    ORDER BY MIN(epoch), MIN(id)
+"""
+
+
+@_cached_analytics
 def get_album_listening_patterns(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -998,76 +1036,17 @@ def get_album_listening_patterns(
             - sequential_albums: Number of albums listened to sequentially
             - shuffle_albums: Number of albums listened to in shuffle mode
     """
-    conn = get_connection()
-    try:
-        # Get all plays with album info, ordered by timestamp
-        query = """
-            SELECT timestamp, title, artist, album, track_number
-            FROM plays
-            WHERE album IS NOT NULL AND album != ''
-        """
-        params = []
-
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date.isoformat())
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date.isoformat())
-
-        query += " ORDER BY timestamp ASC"
-
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {
-                "albums": [],
-                "overall_sequential_rate": 0.0,
-                "sequential_albums": 0,
-                "shuffle_albums": 0,
-            }
-
-        # Group plays by album
-        album_plays: dict[tuple[str, str], list] = defaultdict(list)
-        for row in rows:
-            key = (row["album"], row["artist"] or "Unknown")
-            album_plays[key].append({
-                "timestamp": row["timestamp"],
-                "title": row["title"],
-                "track_number": row["track_number"],
-            })
+    with _read_snapshot() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(_ALBUM_PATTERNS_SQL, time_range_params(start_date, end_date))
 
         albums: list[AlbumListeningPattern] = []
         sequential_albums = 0
         shuffle_albums = 0
 
-        for (album, artist), plays in album_plays.items():
-            if len(plays) < 2:
-                continue
-
-            # Count sequential plays (consecutive plays from same album)
-            sequential_count = 0
-            for i in range(1, len(plays)):
-                prev_time = datetime.fromisoformat(plays[i - 1]["timestamp"])
-                curr_time = datetime.fromisoformat(plays[i]["timestamp"])
-
-                # Check if plays are within 15 minutes (likely same listening session)
-                time_diff = (curr_time - prev_time).total_seconds() / 60
-                if time_diff <= 15:
-                    # Check track number order if available
-                    prev_track = plays[i - 1]["track_number"]
-                    curr_track = plays[i]["track_number"]
-
-                    if prev_track is not None and curr_track is not None:
-                        if curr_track == prev_track + 1:
-                            sequential_count += 1
-                    else:
-                        # Without track numbers, consider consecutive plays as sequential
-                        sequential_count += 1
-
-            total_plays = len(plays)
-            sequential_pct = (sequential_count / (total_plays - 1)) * 100 if total_plays > 1 else 0
+        for album, artist, total_plays, sequential_count in cursor:
+            sequential_pct = (sequential_count / (total_plays - 1)) * 100
 
             # Determine pattern
             pattern = "sequential" if sequential_pct >= 50 else "shuffle"
@@ -1085,23 +1064,23 @@ def get_album_listening_patterns(
                 sequential_percentage=round(sequential_pct, 2),
             ))
 
-        # Sort by total plays descending
-        albums.sort(key=lambda x: x["total_plays"], reverse=True)
+        # Only the 20 most-played albums are returned; every album still
+        # counts toward the sequential/shuffle totals
+        top_albums = heapq.nlargest(20, albums, key=lambda x: x["total_plays"])
 
         total_albums = sequential_albums + shuffle_albums
         overall_sequential_rate = (sequential_albums / total_albums) * 100 if total_albums > 0 else 0
 
         return {
-            "albums": albums[:20],
+            "albums": top_albums,
             "overall_sequential_rate": round(overall_sequential_rate, 2),
             "sequential_albums": sequential_albums,
             "shuffle_albums": shuffle_albums,
         }
-    finally:
-        conn.close()
 
 
 # Convenience function to run all analytics
+@_cached_analytics
 def get_time_analytics(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -1117,9 +1096,8 @@ def get_time_analytics(
 
     Returns:
         Dictionary containing results from all analytics functions.
-    """
-    conn = get_connection()
-    try:
+    """
+    with _read_snapshot() as conn:
         return {
             "streaks": get_listening_streaks(conn, start_date, end_date),
             "sessions": get_sessions(conn, start_date, end_date),
@@ -1127,8 +1105,6 @@ def get_time_analytics(
             "biggest_day": get_biggest_listening_day(conn, start_date, end_date),
             "hourly_heatmap": get_hourly_heatmap(conn, start_date, end_date),
         }
-    finally:
-        conn.close()
 
 
 # =============================================================================
@@ -1136,6 +1112,45 @@ def get_time_analytics(
 # =============================================================================
 
 
+# Range totals behind the skip, track length and full-listen figures, in one
+# pass over the daily_stats counters. A skip is any play shorter than 30
+# seconds; full listens and completion count plays with duration data.
+_TRACK_TOTALS_SQL = f"""
+    SELECT
+        COALESCE(SUM(timed_plays), 0) as timed_plays,
+        COALESCE(SUM(short_plays), 0) as short_plays,
+        COALESCE(SUM(rated_plays), 0) as rated_plays,
+        COALESCE(SUM(full_listens), 0) as full_listens,
+        SUM(completion_sum) / SUM(rated_plays) as average_completion,
+        COALESCE(SUM(sized_plays), 0) as sized_plays,
+        SUM(duration_sum) * 1.0 / SUM(sized_plays) as average_duration_ms
+    FROM {_daily_totals(
+        "timed_plays", "short_plays", "rated_plays", "full_listens",
+        "completion_sum", "sized_plays", "duration_sum",
+    )}
+"""
+
+
+def _track_totals(
+    conn: sqlite3.Connection,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> sqlite3.Row:
+    """Shared totals row for the track behavior analytics."""
+    return conn.execute(
+        _TRACK_TOTALS_SQL, time_range_params(start_date, end_date) * 3
+    ).fetchone()
+
+
+_SKIPPED_TRACKS_SQL = f"""
+    SELECT title, artist, COUNT(*) as skip_count
+    FROM plays
+    WHERE played_ms < 30000 AND {TIME_RANGE}
+    GROUP BY title, artist
+    ORDER BY skip_count DESC, MIN(timestamp)
+"""
+
+
 def get_skip_rate(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -1159,24 +1174,9 @@ def get_skip_rate(
             - most_skipped: List of (title, artist, skip_count) tuples,
                             sorted by skip count descending.
     """
-    query = """
-        SELECT title, artist, played_ms
-        FROM plays
-        WHERE played_ms IS NOT NULL
-    """
-    params = []
-
-    if start_date:
-        query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    cursor = conn.execute(query, params)
-    rows = cursor.fetchall()
+    totals = _track_totals(conn, start_date, end_date)
 
-    total_plays = len(rows)
+    total_plays = totals["timed_plays"]
     if total_plays == 0:
         return {
             "skip_percentage": 0.0,
@@ -1185,23 +1185,15 @@ def get_skip_rate(
             "most_skipped": [],
         }
 
-    skip_counts = defaultdict(int)
-    total_skips = 0
-
-    for row in rows:
-        if row["played_ms"] < 30000:
-            total_skips += 1
-            key = (row["title"], row["artist"])
-            skip_counts[key] += 1
-
+    total_skips = totals["short_plays"]
     skip_percentage = (total_skips / total_plays) * 100
 
-    # Sort by skip count descending
-    most_skipped = sorted(
-        [(title, artist, count) for (title, artist), count in skip_counts.items()],
-        key=lambda x: x[2],
-        reverse=True,
-    )
+    # Plain tuple rows are already the (title, artist, skip_count) shape
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    most_skipped = cursor.execute(
+        _SKIPPED_TRACKS_SQL, time_range_params(start_date, end_date)
+    ).fetchall()
 
     return {
         "skip_percentage": round(skip_percentage, 2),
@@ -1211,6 +1203,29 @@ def get_skip_rate(
     }
 
 
+# Track-days with more than one play; every play after the first that day is
+# a repeat. Each row also carries the number of distinct days with any repeat.
+# Grouping day-first lets idx_plays_date_track feed the groups in order.
+_REPEAT_OBSESSIONS_SQL = f"""
+    WITH daily_repeats AS (
+        SELECT title, artist, DATE(timestamp) as play_date, COUNT(*) as daily_count
+        FROM plays
+        WHERE {_DAY_RANGE} AND {TIME_RANGE}
+        GROUP BY DATE(timestamp), title, artist
+        HAVING COUNT(*) > 1
+    )
+    SELECT
+        title,
+        artist,
+        SUM(daily_count - 1) as total_repeats,
+        COUNT(*) as days_with_repeats,
+        (SELECT COUNT(DISTINCT play_date) FROM daily_repeats) as days_with_obsessions
+    FROM daily_repeats
+    GROUP BY title, artist
+    ORDER BY total_repeats DESC, title, artist
+"""
+
+
 def get_repeat_obsessions(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -1232,57 +1247,47 @@ def get_repeat_obsessions(
                              and days_with_repeats, sorted by total repeats.
             - days_with_obsessions: Number of days where any track was repeated.
     """
-    query = """
-        SELECT title, artist, DATE(timestamp) as play_date, COUNT(*) as daily_count
-        FROM plays
-        WHERE 1=1
-    """
-    params = []
+    cursor = conn.execute(_REPEAT_OBSESSIONS_SQL, time_range_params(start_date, end_date) * 2)
 
-    if start_date:
-        query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    query += " GROUP BY title, artist, DATE(timestamp) HAVING COUNT(*) > 1"
-
-    cursor = conn.execute(query, params)
-    rows = cursor.fetchall()
-
-    # Aggregate repeats per track
-    track_repeats = defaultdict(lambda: {"total_repeats": 0, "days_with_repeats": 0})
-    days_with_obsessions = set()
-
-    for row in rows:
-        key = (row["title"], row["artist"])
-        # Repeat count is plays minus 1 (first play isn't a repeat)
-        repeat_count = row["daily_count"] - 1
-        track_repeats[key]["total_repeats"] += repeat_count
-        track_repeats[key]["days_with_repeats"] += 1
-        days_with_obsessions.add(row["play_date"])
-
-    most_repeated = sorted(
-        [
-            {
-                "title": title,
-                "artist": artist,
-                "total_repeats": data["total_repeats"],
-                "days_with_repeats": data["days_with_repeats"],
-            }
-            for (title, artist), data in track_repeats.items()
-        ],
-        key=lambda x: x["total_repeats"],
-        reverse=True,
-    )
+    most_repeated = []
+    days_with_obsessions = 0
+    for title, artist, total_repeats, days_with_repeats, days_with_obsessions in cursor:
+        most_repeated.append({
+            "title": title,
+            "artist": artist,
+            "total_repeats": total_repeats,
+            "days_with_repeats": days_with_repeats,
+        })
 
     return {
         "most_repeated": most_repeated,
-        "days_with_obsessions": len(days_with_obsessions),
+        "days_with_obsessions": days_with_obsessions,
     }
 
 
+# Unique tracks played per album in the range, against the unique tracks
+# seen for that album over all time (looked up only for albums in range),
+# highest completion first
+_ALBUM_COMPLETION_SQL = f"""
+    SELECT
+        album,
+        artist,
+        COUNT(DISTINCT title) as tracks_played,
+        (
+            SELECT COUNT(DISTINCT p.title)
+            FROM plays p
+            WHERE p.album = plays.album AND p.artist IS plays.artist
+        ) as total_tracks
+    FROM plays
+    WHERE album IS NOT NULL AND album != '' AND {TIME_RANGE}
+    GROUP BY album, artist
+    ORDER BY
+        COALESCE(ROUND(tracks_played * 100.0 / total_tracks, 2), 0) DESC,
+        album,
+        artist
+"""
+
+
 def get_album_completion(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -1305,56 +1310,22 @@ def get_album_completion(
                       total_tracks, and completion_percentage.
             - average_completion: Average completion percentage across all albums.
     """
-    # First, get total unique tracks per album (from all time)
-    total_tracks_query = """
-        SELECT album, artist, COUNT(DISTINCT title) as total_tracks
-        FROM plays
-        WHERE album IS NOT NULL AND album != ''
-        GROUP BY album, artist
-    """
-    cursor = conn.execute(total_tracks_query)
-    album_totals = {
-        (row["album"], row["artist"]): row["total_tracks"]
-        for row in cursor.fetchall()
-    }
-
-    # Now get unique tracks played in the date range
-    range_query = """
-        SELECT album, artist, COUNT(DISTINCT title) as tracks_played
-        FROM plays
-        WHERE album IS NOT NULL AND album != ''
-    """
-    params = []
-
-    if start_date:
-        range_query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        range_query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    range_query += " GROUP BY album, artist"
-
-    cursor = conn.execute(range_query, params)
-    rows = cursor.fetchall()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(_ALBUM_COMPLETION_SQL, time_range_params(start_date, end_date))
 
     albums = []
-    for row in rows:
-        key = (row["album"], row["artist"])
-        total_tracks = album_totals.get(key, row["tracks_played"])
-        completion = (row["tracks_played"] / total_tracks * 100) if total_tracks > 0 else 0
+    for album, artist, tracks_played, total_tracks in cursor:
+        completion = (tracks_played / total_tracks * 100) if total_tracks > 0 else 0
 
         albums.append({
-            "album": row["album"],
-            "artist": row["artist"],
-            "tracks_played": row["tracks_played"],
+            "album": album,
+            "artist": artist,
+            "tracks_played": tracks_played,
             "total_tracks": total_tracks,
             "completion_percentage": round(completion, 2),
         })
 
-    # Sort by completion percentage descending
-    albums.sort(key=lambda x: x["completion_percentage"], reverse=True)
-
     average_completion = (
         sum(a["completion_percentage"] for a in albums) / len(albums)
         if albums else 0
@@ -1366,6 +1337,27 @@ def get_album_completion(
     }
 
 
+# Plays with duration data. The shortest and longest tracks are separate
+# LIMIT 1 lookups; on equal durations the earliest play wins.
+_TRACK_LENGTH_WHERE = f"duration_ms IS NOT NULL AND duration_ms > 0 AND {TIME_RANGE}"
+
+_SHORTEST_TRACK_SQL = f"""
+    SELECT title, artist, duration_ms
+    FROM plays
+    WHERE {_TRACK_LENGTH_WHERE}
+    ORDER BY duration_ms ASC, timestamp
+    LIMIT 1
+"""
+
+_LONGEST_TRACK_SQL = f"""
+    SELECT title, artist, duration_ms
+    FROM plays
+    WHERE {_TRACK_LENGTH_WHERE}
+    ORDER BY duration_ms DESC, timestamp
+    LIMIT 1
+"""
+
+
 def get_average_track_length(
     conn: sqlite3.Connection,
     start_date: Optional[datetime] = None,
@@ -1387,24 +1379,9 @@ def get_average_track_length(
             - shortest_track: Dict with title, artist, duration_ms of shortest.
             - longest_track: Dict with title, artist, duration_ms of longest.
     """
-    query = """
-        SELECT title, artist, duration_ms
-        FROM plays
-        WHERE duration_ms IS NOT NULL AND duration_ms > 0
-    """
-    params = []
-
-    if start_date:
-        query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    cursor = conn.execute(query, params)
-    rows = cursor.fetchall()
+    totals = _track_totals(conn, start_date, end_date)
 
-    if not rows:
+    if totals["sized_plays"] == 0:
         return {
             "average_duration_ms": 0,
             "average_duration_formatted": "0:00",
@@ -1413,13 +1390,10 @@ def get_average_track_length(
             "longest_track": None,
         }
 
-    durations = [(row["title"], row["artist"], row["duration_ms"]) for row in rows]
-    total_duration = sum(d[2] for d in durations)
-    avg_duration = total_duration / len(durations)
-
-    # Find shortest and longest
-    shortest = min(durations, key=lambda x: x[2])
-    longest = max(durations, key=lambda x: x[2])
+    avg_duration = totals["average_duration_ms"]
+    params = time_range_params(start_date, end_date)
+    shortest = conn.execute(_SHORTEST_TRACK_SQL, params).fetchone()
+    longest = conn.execute(_LONGEST_TRACK_SQL, params).fetchone()
 
     # Format average duration as MM:SS
     avg_seconds = int(avg_duration / 1000)
@@ -1428,17 +1402,9 @@ def get_average_track_length(
     return {
         "average_duration_ms": round(avg_duration, 2),
         "average_duration_formatted": formatted,
-        "total_tracks": len(durations),
-        "shortest_track": {
-            "title": shortest[0],
-            "artist": shortest[1],
-            "duration_ms": shortest[2],
-        },
-        "longest_track": {
-            "title": longest[0],
-            "artist": longest[1],
-            "duration_ms": longest[2],
-        },
+        "total_tracks": totals["sized_plays"],
+        "shortest_track": dict(shortest),
+        "longest_track": dict(longest),
     }
 
 
@@ -1464,25 +1430,10 @@ def get_full_listens_vs_partial(
             - total_plays: Total plays with valid duration data.
             - average_completion_percentage: Average played_ms/duration_ms ratio.
     """
-    query = """
-        SELECT title, artist, duration_ms, played_ms
-        FROM plays
-        WHERE duration_ms IS NOT NULL AND duration_ms > 0
-          AND played_ms IS NOT NULL
-    """
-    params = []
-
-    if start_date:
-        query += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        query += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
-
-    cursor = conn.execute(query, params)
-    rows = cursor.fetchall()
+    row = _track_totals(conn, start_date, end_date)
 
-    if not rows:
+    total = row["rated_plays"]
+    if total == 0:
         return {
             "full_listens": 0,
             "partial_listens": 0,
@@ -1492,21 +1443,8 @@ def get_full_listens_vs_partial(
             "average_completion_percentage": 0.0,
         }
 
-    full_listens = 0
-    partial_listens = 0
-    completion_ratios = []
-
-    for row in rows:
-        ratio = row["played_ms"] / row["duration_ms"]
-        completion_ratios.append(min(ratio, 1.0) * 100)  # Cap at 100%
-
-        if ratio >= 0.9:
-            full_listens += 1
-        else:
-            partial_listens += 1
-
-    total = len(rows)
-    avg_completion = sum(completion_ratios) / len(completion_ratios)
+    full_listens = row["full_listens"]
+    partial_listens = total - full_listens
 
     return {
         "full_listens": full_listens,
@@ -1514,7 +1452,7 @@ def get_full_listens_vs_partial(
         "full_listen_percentage": round((full_listens / total) * 100, 2),
         "partial_listen_percentage": round((partial_listens / total) * 100, 2),
         "total_plays": total,
-        "average_completion_percentage": round(avg_completion, 2),
+        "average_completion_percentage": round(row["average_completion"], 2),
     }
 
 
@@ -1535,8 +1473,7 @@ def get_track_behavior_analytics(
     Returns:
         Dictionary containing results from all track behavior analytics functions.
     """
-    conn = get_connection()
-    try:
+    with _read_snapshot() as conn:
         return {
             "skip_rate": get_skip_rate(conn, start_date, end_date),
             "repeat_obsessions": get_repeat_obsessions(conn, start_date, end_date),
@@ -1544,8 +1481,6 @@ def get_track_behavior_analytics(
             "average_track_length": get_average_track_length(conn, start_date, end_date),
             "full_vs_partial": get_full_listens_vs_partial(conn, start_date, end_date),
         }
-    finally:
-        conn.close()
 
 
 # =============================================================================
@@ -1576,18 +1511,33 @@ def get_discovery_rate(
             "returning_artist_list": list of artist names
         }
     """
-    # Get all unique artists played in the period
-    cursor = conn.execute(
+    # Classify every artist played in the period in one pass: an artist is
+    # returning when their first play ever falls before the period starts.
+    # Both name lists come back as sorted JSON arrays.
+    row = conn.execute(
         """
-        SELECT DISTINCT artist
-        FROM plays
-        WHERE timestamp >= ? AND timestamp <= ? AND artist IS NOT NULL
+        SELECT
+            json_group_array(artist) FILTER (WHERE NOT played_before),
+            json_group_array(artist) FILTER (WHERE played_before)
+        FROM (
+            SELECT artist, MIN(timestamp) < ? as played_before
+            FROM plays
+            WHERE artist IN (
+                SELECT artist
+                FROM plays
+                WHERE timestamp >= ? AND timestamp <= ? AND artist IS NOT NULL
+            )
+            GROUP BY artist
+            ORDER BY artist
+        )
         """,
-        (start_date, end_date),
-    )
-    artists_in_period = {row["artist"] for row in cursor.fetchall()}
+        (start_date, start_date, end_date),
+    ).fetchone()
 
-    if not artists_in_period:
+    new_artists = json.loads(row[0])
+    returning_artists = json.loads(row[1])
+
+    if not new_artists and not returning_artists:
         return {
             "total_artists": 0,
             "new_artists": 0,
@@ -1597,27 +1547,7 @@ def get_discovery_rate(
             "returning_artist_list": [],
         }
 
-    # For each artist, check if they had any plays before the period
-    new_artists = []
-    returning_artists = []
-
-    for artist in artists_in_period:
-        cursor = conn.execute(
-            """
-            SELECT COUNT(*) as count
-            FROM plays
-            WHERE artist = ? AND timestamp < ?
-            """,
-            (artist, start_date),
-        )
-        plays_before = cursor.fetchone()["count"]
-
-        if plays_before == 0:
-            new_artists.append(artist)
-        else:
-            returning_artists.append(artist)
-
-    total = len(artists_in_period)
+    total = len(new_artists) + len(returning_artists)
     discovery_rate = (len(new_artists) / total * 100) if total > 0 else 0.0
 
     return {
@@ -1625,8 +1555,8 @@ def get_discovery_rate(
         "new_artists": len(new_artists),
         "returning_artists": len(returning_artists),
         "discovery_rate": round(discovery_rate, 2),
-        "new_artist_list": sorted(new_artists),
-        "returning_artist_list": sorted(returning_artists),
+        "new_artist_list": new_artists,
+        "returning_artist_list": returning_artists,
     }
 
 
@@ -1657,39 +1587,39 @@ def get_artist_loyalty(
             ...
         ]
     """
-    # Get top artists by play count in the period
+    # Top artists in the period joined with their all-time first play and
+    # play count, in one statement
     cursor = conn.execute(
         """
-        SELECT artist, COUNT(*) as play_count
-        FROM plays
-        WHERE timestamp >= ? AND timestamp <= ? AND artist IS NOT NULL
-        GROUP BY artist
-        ORDER BY play_count DESC
-        LIMIT ?
+        WITH top_artists AS (
+            SELECT artist, COUNT(*) as play_count
+            FROM plays
+            WHERE timestamp >= ? AND timestamp <= ? AND artist IS NOT NULL
+            GROUP BY artist
+            ORDER BY play_count DESC
+            LIMIT ?
+        )
+        SELECT
+            t.artist,
+            t.play_count,
+            MIN(p.timestamp) as first_play,
+            COUNT(*) as total_plays
+        FROM top_artists t
+        JOIN plays p ON p.artist = t.artist
+        GROUP BY t.artist
+        ORDER BY t.play_count DESC
         """,
         (start_date, end_date, top_n),
     )
-    top_artists = cursor.fetchall()
 
     results = []
     today = datetime.now()
 
-    for row in top_artists:
+    for row in cursor:
         artist = row["artist"]
         plays_in_period = row["play_count"]
-
-        # Find first ever play of this artist
-        cursor = conn.execute(
-            """
-            SELECT MIN(timestamp) as first_play, COUNT(*) as total_plays
-            FROM plays
-            WHERE artist = ?
-            """,
-            (artist,),
-        )
-        stats = cursor.fetchone()
-        first_play_str = stats["first_play"]
-        total_plays = stats["total_plays"]
+        first_play_str = row["first_play"]
+        total_plays = row["total_plays"]
 
         # Calculate days since first listen
         if first_play_str:
@@ -1738,35 +1668,40 @@ def get_one_hit_wonders(
             ...
         ]
     """
-    # Get artists played in the period who have exactly 1 play ever
-    cursor = conn.execute(
+    # Artists with exactly one play in the period, kept only when no other
+    # play of theirs exists at all (one idx_plays_artist_ts probe each), so
+    # the work scales with the period rather than the whole history. Built
+    # as one JSON array in SQLite.
+    row = conn.execute(
         """
-        SELECT p.artist, p.title, p.album, p.timestamp as played_on
-        FROM plays p
-        WHERE p.artist IS NOT NULL
-          AND p.timestamp >= ? AND p.timestamp <= ?
-          AND p.artist IN (
-              SELECT artist
-              FROM plays
-              WHERE artist IS NOT NULL
-              GROUP BY artist
-              HAVING COUNT(*) = 1
-          )
-        ORDER BY p.artist
+        WITH single_in_period AS (
+            SELECT artist, title, album, timestamp as played_on, id
+            FROM plays
+            WHERE artist IS NOT NULL AND timestamp >= ? AND timestamp <= ?
+            GROUP BY artist
+            HAVING COUNT(*) = 1
+        )
+        SELECT json_group_array(json_object(
+            'artist', artist,
+            'title', title,
+            'album', album,
+            'played_on', played_on
+        ))
+        FROM (
+            SELECT artist, title, album, played_on
+            FROM single_in_period s
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM plays other
+                WHERE other.artist = s.artist AND other.id <> s.id
+            )
+            ORDER BY artist
+        )
         """,
         (start_date, end_date),
-    )
-
-    results = []
-    for row in cursor.fetchall():
-        results.append({
-            "artist": row["artist"],
-            "title": row["title"],
-            "album": row["album"],
-            "played_on": row["played_on"],
-        })
+    ).fetchone()
 
-    return results
+    return json.loads(row[0])
 
 
 def get_monthly_top_artists(
@@ -1809,51 +1744,50 @@ def get_monthly_top_artists(
         "December",
     ]
 
-    results = []
-
-    for month in range(1, 13):
-        start_date = f"{year}-{month:02d}-01"
-        if month == 12:
-            end_date = f"{year + 1}-01-01"
-        else:
-            end_date = f"{year}-{month + 1:02d}-01"
-
-        # Get top 2 artists for this month
-        cursor = conn.execute(
-            """
-            SELECT artist, COUNT(*) as play_count
+    # Rank artists within each month of the year in one scan and keep the
+    # top two per month
+    cursor = conn.execute(
+        """
+        SELECT month, artist, play_count
+        FROM (
+            SELECT
+                CAST(strftime('%m', timestamp) AS INTEGER) as month,
+                artist,
+                COUNT(*) as play_count,
+                ROW_NUMBER() OVER (
+                    PARTITION BY CAST(strftime('%m', timestamp) AS INTEGER)
+                    ORDER BY COUNT(*) DESC
+                ) as rank
             FROM plays
             WHERE timestamp >= ? AND timestamp < ? AND artist IS NOT NULL
-            GROUP BY artist
-            ORDER BY play_count DESC
-            LIMIT 2
-            """,
-            (start_date, end_date),
+            GROUP BY month, artist
         )
-        top_artists = cursor.fetchall()
-
-        if not top_artists:
-            results.append({
-                "month": month,
-                "month_name": month_names[month],
-                "top_artist": None,
-                "play_count": 0,
-                "runner_up": None,
-                "runner_up_count": None,
-            })
+        WHERE rank <= 2
+        ORDER BY month, rank
+        """,
+        (f"{year}-01-01", f"{year + 1}-01-01"),
+    )
+
+    results = [
+        {
+            "month": month,
+            "month_name": month_names[month],
+            "top_artist": None,
+            "play_count": 0,
+            "runner_up": None,
+            "runner_up_count": None,
+        }
+        for month in range(1, 13)
+    ]
+
+    for row in cursor:
+        result = results[row["month"] - 1]
+        if result["top_artist"] is None:
+            result["top_artist"] = row["artist"]
+            result["play_count"] = row["play_count"]
         else:
-            result = {
-                "month": month,
-                "month_name": month_names[month],
-                "top_artist": top_artists[0]["artist"],
-                "play_count": top_artists[0]["play_count"],
-                "runner_up": None,
-                "runner_up_count": None,
-            }
-            if len(top_artists) > 1:
-                result["runner_up"] = top_artists[1]["artist"]
-                result["runner_up_count"] = top_artists[1]["play_count"]
-            results.append(result)
+            result["runner_up"] = row["artist"]
+            result["runner_up_count"] = row["play_count"]
 
     return results
 
@@ -1896,57 +1830,74 @@ def get_artist_deep_cuts(
             ...
         ]
     """
-    # Get top artists with enough plays in the period
-    cursor = conn.execute(
+    # Top artists with enough plays in the period, each with up to five of
+    # their least-played tracks (counted over all time), built as one JSON
+    # array in SQLite. artist_rank carries the top-artist order through.
+    row = conn.execute(
         """
-        SELECT artist, COUNT(*) as total_plays, COUNT(DISTINCT title) as unique_tracks
-        FROM plays
-        WHERE timestamp >= ? AND timestamp <= ? AND artist IS NOT NULL
-        GROUP BY artist
-        HAVING total_plays >= ?
-        ORDER BY total_plays DESC
-        LIMIT ?
-        """,
-        (start_date, end_date, min_artist_plays, top_artists),
-    )
-    artists = cursor.fetchall()
-
-    results = []
-
-    for artist_row in artists:
-        artist = artist_row["artist"]
-
-        # Find deep cuts: tracks with few plays ever (not just in period)
-        cursor = conn.execute(
-            """
-            SELECT title, album, COUNT(*) as play_count, MIN(timestamp) as first_played
+        WITH top_artists AS (
+            SELECT artist, COUNT(*) as total_plays, COUNT(DISTINCT title) as unique_tracks
             FROM plays
-            WHERE artist = ? AND title IS NOT NULL
-            GROUP BY title
+            WHERE timestamp >= ? AND timestamp <= ? AND artist IS NOT NULL
+            GROUP BY artist
+            HAVING total_plays >= ?
+            ORDER BY total_plays DESC
+            LIMIT ?
+        ),
+        ranked_artists AS (
+            SELECT *, ROW_NUMBER() OVER () as artist_rank
+            FROM top_artists
+        ),
+        deep_cuts AS MATERIALIZED (
+            SELECT
+                p.artist,
+                p.title,
+                p.album,
+                COUNT(*) as play_count,
+                MIN(p.timestamp) as first_played,
+                ROW_NUMBER() OVER (
+                    PARTITION BY p.artist
+                    ORDER BY COUNT(*) ASC, MIN(p.timestamp) DESC
+                ) as cut_rank
+            FROM plays p
+            JOIN top_artists t ON t.artist = p.artist
+            WHERE p.title IS NOT NULL
+            GROUP BY p.artist, p.title
             HAVING play_count <= ?
-            ORDER BY play_count ASC, first_played DESC
-            LIMIT 5
-            """,
-            (artist, max_track_plays),
         )
-        deep_cuts = cursor.fetchall()
-
-        results.append({
-            "artist": artist,
-            "total_plays": artist_row["total_plays"],
-            "unique_tracks": artist_row["unique_tracks"],
-            "deep_cuts": [
-                {
-                    "title": row["title"],
-                    "album": row["album"],
-                    "play_count": row["play_count"],
-                    "first_played": row["first_played"],
-                }
-                for row in deep_cuts
-            ],
-        })
+        SELECT json_group_array(json_object(
+            'artist', artist,
+            'total_plays', total_plays,
+            'unique_tracks', unique_tracks,
+            'deep_cuts', json(deep_cuts)
+        ))
+        FROM (
+            SELECT
+                t.artist,
+                t.total_plays,
+                t.unique_tracks,
+                (
+                    SELECT json_group_array(json_object(
+                        'title', c.title,
+                        'album', c.album,
+                        'play_count', c.play_count,
+                        'first_played', c.first_played
+                    ))
+                    FROM (
+                        SELECT *
+                        FROM deep_cuts
+                        WHERE artist = t.artist AND cut_rank <= 5
+                        ORDER BY cut_rank
+                    ) c
+                ) as deep_cuts
+            FROM ranked_artists t
+            ORDER BY t.artist_rank
+        )
+        """,
+        (start_date, end_date, min_artist_plays, top_artists, max_track_plays),
+    ).fetchone()
 
-    return results
+    return json.loads(row[0])
 
 
 # =============================================================================
@@ -1956,38 +1907,26 @@ def get_artist_deep_cuts(
 
 def discovery_rate(start_date: str, end_date: str) -> dict:
     """Convenience wrapper for get_discovery_rate."""
-    conn = get_connection()
-    try:
+    with _read_snapshot() as conn:
         return get_discovery_rate(conn, start_date, end_date)
-    finally:
-        conn.close()
 
 
 def artist_loyalty(start_date: str, end_date: str, top_n: int = 10) -> list[dict]:
     """Convenience wrapper for get_artist_loyalty."""
-    conn = get_connection()
-    try:
+    with _read_snapshot() as conn:
         return get_artist_loyalty(conn, start_date, end_date, top_n)
-    finally:
-        conn.close()
 
 
 def one_hit_wonders(start_date: str, end_date: str) -> list[dict]:
     """Convenience wrapper for get_one_hit_wonders."""
-    conn = get_connection()
-    try:
+    with _read_snapshot() as conn:
         return get_one_hit_wonders(conn, start_date, end_date)
-    finally:
-        conn.close()
 
 
 def monthly_top_artists(year: int) -> list[dict]:
     """Convenience wrapper for get_monthly_top_artists."""
-    conn = get_connection()
-    try:
+    with _read_snapshot() as conn:
         return get_monthly_top_artists(conn, year)
-    finally:
-        conn.close()
 
 
 def artist_deep_cuts(
@@ -1998,13 +1937,10 @@ def artist_deep_cuts(
     top_artists: int = 10,
 ) -> list[dict]:
     """Convenience wrapper for get_artist_deep_cuts."""
-    conn = get_connection()
-    try:
+    with _read_snapshot() as conn:
         return get_artist_deep_cuts(
             conn, start_date, end_date, min_artist_plays, max_track_plays, top_artists
         )
-    finally:
-        conn.close()
 
 
 def get_artist_analytics(
@@ -2025,8 +1961,7 @@ def get_artist_analytics(
     if year is None:
         year = int(start_date[:4])
 
-    conn = get_connection()
-    try:
+    with _read_snapshot() as conn:
         return {
             "discovery_rate": get_discovery_rate(conn, start_date, end_date),
             "artist_loyalty": get_artist_loyalty(conn, start_date, end_date),
@@ -2034,15 +1969,77 @@ def get_artist_analytics(
             "monthly_top_artists": get_monthly_top_artists(conn, year),
             "artist_deep_cuts": get_artist_deep_cuts(conn, start_date, end_date),
         }
-    finally:
-        conn.close()
 
 
 # =============================================================================
 # MILESTONES & ACHIEVEMENTS
 # =============================================================================
 
-def get_milestones(conn: sqlite3.Connection) -> list[dict]:
+# Milestone thresholds per category: (threshold, name, description, icon),
+# in ascending threshold order
+_PLAY_MILESTONES = (
+    (100, "Century Club", "You've hit 100 total plays! The journey has begun.", "[100]"),
+    (500, "High Fidelity", "500 plays and counting! Music is clearly your thing.", "[500]"),
+    (1000, "Thousand Play Legend", "1,000 plays! You're a certified music lover!", "[1K]"),
+    (5000, "Music Marathon Master", "5,000 plays! That's some serious dedication!", "[5K]"),
+    (10000, "Ten Thousand Titan", "10,000 plays! You could run your own radio station!", "[10K]"),
+)
+
+_ARTIST_MILESTONES = (
+    (10, "Curious Ears", "You've explored 10 different artists!", "[10A]"),
+    (50, "Genre Hopper", "50 unique artists in your library! Eclectic taste!", "[50A]"),
+    (100, "Taste Explorer", "100 artists! Your musical palette is impressively vast!", "[100A]"),
+    (250, "Festival Curator", "250 artists! You could book your own music festival!", "[250A]"),
+)
+
+_SONG_MILESTONES = (
+    (100, "Song Collector", "100 unique songs in your collection!", "[100S]"),
+    (500, "Playlist Pro", "500 unique songs! That's a serious playlist!", "[500S]"),
+    (1000, "Track Titan", "1,000 unique songs! You're a walking jukebox!", "[1KS]"),
+    (2500, "Melody Master", "2,500 songs! You've heard more than most will in years!", "[2.5KS]"),
+)
+
+_HOURS_MILESTONES = (
+    (10, "Getting Started", "10 hours of music! The journey begins!", "[10H]"),
+    (50, "Dedicated Listener", "50 hours! That's over 2 full days of music!", "[50H]"),
+    (100, "Century Hours", "100 hours! Music is clearly part of your life!", "[100H]"),
+    (500, "Audiophile Status", "500 hours! You've spent almost 21 days listening!", "[500H]"),
+    (1000, "Legendary Listener", "1,000 hours! That's 41+ days of pure music!", "[1KH]"),
+)
+
+
+def _reached_milestones(milestones: tuple, total: float) -> list[tuple]:
+    """Leading milestones of an ascending threshold table that total reaches."""
+    return list(itertools.takewhile(lambda m: total >= m[0], milestones))
+
+
+def _timestamps_at_ranks(
+    conn: sqlite3.Connection,
+    timestamps_sql: str,
+    ranks: list[int],
+) -> dict[int, str]:
+    """Map 1-based ranks to the timestamp at that position, earliest first.
+
+    timestamps_sql selects a single column named ts. Every rank is answered
+    by one query, which only orders as many rows as the largest rank needs.
+    """
+    if not ranks:
+        return {}
+    cursor = conn.execute(f"""
+        SELECT rn, ts FROM (
+            SELECT ROW_NUMBER() OVER (ORDER BY ts) as rn, ts
+            FROM (
+                SELECT ts FROM ({timestamps_sql})
+                ORDER BY ts
+                LIMIT ?
+            )
+        )
+        WHERE rn IN (SELECT value FROM json_each(?))
+    """, (max(ranks), json.dumps(ranks)))
+    return dict(cursor.fetchall())
+
+
+def get_milestones(conn: sqlite3.Connection) -> list[Milestone]:
     """
     Check for achieved milestones/achievements.
 
@@ -2057,163 +2054,285 @@ def get_milestones(conn: sqlite3.Connection) -> list[dict]:
         - category: Category of the milestone (plays, artists, songs, hours)
         - threshold: The threshold value that was reached
     """
-    milestones = []
-
-    # Define milestone thresholds
-    play_milestones = [
-        (100, "Century Club", "You've hit 100 total plays! The journey has begun.", "[100]"),
-        (500, "High Fidelity", "500 plays and counting! Music is clearly your thing.", "[500]"),
-        (1000, "Thousand Play Legend", "1,000 plays! You're a certified music lover!", "[1K]"),
-        (5000, "Music Marathon Master", "5,000 plays! That's some serious dedication!", "[5K]"),
-        (10000, "Ten Thousand Titan", "10,000 plays! You could run your own radio station!", "[10K]"),
-    ]
+    milestones: list[Milestone] = []
 
-    artist_milestones = [
-        (10, "Curious Ears", "You've explored 10 different artists!", "[10A]"),
-        (50, "Genre Hopper", "50 unique artists in your library! Eclectic taste!", "[50A]"),
-        (100, "Taste Explorer", "100 artists! Your musical palette is impressively vast!", "[100A]"),
-        (250, "Festival Curator", "250 artists! You could book your own music festival!", "[250A]"),
-    ]
+    # Totals for every milestone category in one query. Unique songs are
+    # counted by grouping on (title, artist), which walks
+    # idx_plays_title_artist instead of hashing a concatenated string per row.
+    totals = conn.execute("""
+        SELECT
+            COUNT(*) as total_plays,
+            COUNT(DISTINCT artist) as unique_artists,
+            (SELECT COUNT(*) FROM (SELECT 1 FROM plays GROUP BY title, artist)) as unique_songs,
+            SUM(played_ms) as total_ms
+        FROM plays
+    """).fetchone()
+    total_plays = totals['total_plays']
+    unique_artists = totals['unique_artists']
+    unique_songs = totals['unique_songs']
+    total_ms = totals['total_ms'] or 0
 
-    song_milestones = [
-        (100, "Song Collector", "100 unique songs in your collection!", "[100S]"),
-        (500, "Playlist Pro", "500 unique songs! That's a serious playlist!", "[500S]"),
-        (1000, "Track Titan", "1,000 unique songs! You're a walking jukebox!", "[1KS]"),
-        (2500, "Melody Master", "2,500 songs! You've heard more than most will in years!", "[2.5KS]"),
-    ]
+    # Check total plays milestones (achieved at the Nth play)
+    reached = _reached_milestones(_PLAY_MILESTONES, total_plays)
+    achieved = _timestamps_at_ranks(
+        conn, "SELECT timestamp as ts FROM plays", [m[0] for m in reached]
+    )
+    milestones.extend(
+        Milestone(
+            name=name,
+            description=description,
+            achieved_date=achieved.get(threshold),
+            icon=icon,
+            category='plays',
+            threshold=threshold,
+        )
+        for threshold, name, description, icon in reached
+    )
 
-    hours_milestones = [
-        (10, "Getting Started", "10 hours of music! The journey begins!", "[10H]"),
-        (50, "Dedicated Listener", "50 hours! That's over 2 full days of music!", "[50H]"),
-        (100, "Century Hours", "100 hours! Music is clearly part of your life!", "[100H]"),
-        (500, "Audiophile Status", "500 hours! You've spent almost 21 days listening!", "[500H]"),
-        (1000, "Legendary Listener", "1,000 hours! That's 41+ days of pure music!", "[1KH]"),
-    ]
+    # Check unique artists milestones (achieved when the Nth unique artist
+    # was first played)
+    reached = _reached_milestones(_ARTIST_MILESTONES, unique_artists)
+    achieved = _timestamps_at_ranks(
+        conn,
+        """
+        SELECT MIN(timestamp) as ts
+        FROM plays WHERE artist IS NOT NULL
+        GROUP BY artist
+        """,
+        [m[0] for m in reached],
+    )
+    milestones.extend(
+        Milestone(
+            name=name,
+            description=description,
+            achieved_date=achieved.get(threshold),
+            icon=icon,
+            category='artists',
+            threshold=threshold,
+        )
+        for threshold, name, description, icon in reached
+    )
 
-    # Check total plays milestones
-    cursor = conn.execute("SELECT COUNT(*) as count FROM plays")
-    total_plays = cursor.fetchone()['count']
-
-    for threshold, name, description, icon in play_milestones:
-        if total_plays >= threshold:
-            # Find when this milestone was achieved
-            date_cursor = conn.execute("""
-                SELECT timestamp FROM plays
-                ORDER BY timestamp ASC
-                LIMIT 1 OFFSET ?
-            """, (threshold - 1,))
-            row = date_cursor.fetchone()
-            achieved_date = row['timestamp'] if row else None
-
-            milestones.append({
-                'name': name,
-                'description': description,
-                'achieved_date': achieved_date,
-                'icon': icon,
-                'category': 'plays',
-                'threshold': threshold,
-            })
+    # Check unique songs milestones (achieved when the Nth unique song was
+    # first played)
+    reached = _reached_milestones(_SONG_MILESTONES, unique_songs)
+    achieved = _timestamps_at_ranks(
+        conn,
+        """
+        SELECT MIN(timestamp) as ts
+        FROM plays
+        GROUP BY title, artist
+        """,
+        [m[0] for m in reached],
+    )
+    milestones.extend(
+        Milestone(
+            name=name,
+            description=description,
+            achieved_date=achieved.get(threshold),
+            icon=icon,
+            category='songs',
+            threshold=threshold,
+        )
+        for threshold, name, description, icon in reached
+    )
 
-    # Check unique artists milestones
-    cursor = conn.execute("SELECT COUNT(DISTINCT artist) as count FROM plays WHERE artist IS NOT NULL")
-    unique_artists = cursor.fetchone()['count']
-
-    for threshold, name, description, icon in artist_milestones:
-        if unique_artists >= threshold:
-            # Find approximate date when this was achieved (when Nth unique artist was first played)
-            date_cursor = conn.execute("""
-                SELECT MAX(first_play) as achieved_date FROM (
-                    SELECT artist, MIN(timestamp) as first_play
-                    FROM plays WHERE artist IS NOT NULL
-                    GROUP BY artist
-                    ORDER BY first_play ASC
-                    LIMIT ?
-                )
-            """, (threshold,))
-            row = date_cursor.fetchone()
-            achieved_date = row['achieved_date'] if row else None
-
-            milestones.append({
-                'name': name,
-                'description': description,
-                'achieved_date': achieved_date,
-                'icon': icon,
-                'category': 'artists',
-                'threshold': threshold,
-            })
+    # Check hours listened milestones. One pass over plays in time order
+    # keeps a running total and stops once the largest reached threshold
+    # has been crossed.
+    total_hours = total_ms / 1000 / 3600
+    reached = _reached_milestones(_HOURS_MILESTONES, total_hours)
+    achieved = {}
+    if reached:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute("""
+            SELECT timestamp, played_ms
+            FROM plays
+            WHERE played_ms IS NOT NULL
+            ORDER BY timestamp
+        """)
+        pending = [m[0] for m in reached]
+        cumulative_ms = 0
+        for timestamp, played_ms in cursor:
+            cumulative_ms += played_ms
+            while pending and cumulative_ms >= pending[0] * 3600 * 1000:
+                achieved[pending.pop(0)] = timestamp
+            if not pending:
+                break
+
+    milestones.extend(
+        Milestone(
+            name=name,
+            description=description,
+            achieved_date=achieved.get(threshold),
+            icon=icon,
+            category='hours',
+            threshold=threshold,
+        )
+        for threshold, name, description, icon in reached
+    )
+
+    # Sort by achieved date
+    milestones.sort(key=lambda x: x['achieved_date'] or '9999')
+
+    return milestones
+
+
+# =============================================================================
+# LISTENING PERSONALITY
+# =============================================================================
 
-    # Check unique songs milestones
-    cursor = conn.execute("SELECT COUNT(DISTINCT title || '-' || COALESCE(artist, '')) as count FROM plays")
-    unique_songs = cursor.fetchone()['count']
-
-    for threshold, name, description, icon in song_milestones:
-        if unique_songs >= threshold:
-            date_cursor = conn.execute("""
-                SELECT MAX(first_play) as achieved_date FROM (
-                    SELECT title, artist, MIN(timestamp) as first_play
-                    FROM plays
-                    GROUP BY title, artist
-                    ORDER BY first_play ASC
-                    LIMIT ?
+# Display name and description for each personality score
+_PERSONALITY_TYPES = {
+    'explorer': ("The Explorer", "You're on a never-ending quest for new sounds. Your library is a treasure map of musical discovery!"),
+    'loyalist': ("The Loyalist", "When you find an artist you love, you stick with them. Your dedication is legendary!"),
+    'night_owl': ("The Night Owl", "Your best listening happens when the world is asleep. The night is your concert hall."),
+    'early_bird': ("The Early Bird", "Nothing starts the day right like your favorite tunes. Morning music is your ritual!"),
+    'completionist': ("The Completionist", "Skip a track? Never! You appreciate albums as complete artistic statements."),
+    'binge_listener': ("The Obsessive", "When you love a song, you REALLY love it. Repeat button is your best friend!"),
+    'weekend_warrior': ("The Weekend Warrior", "You save your serious listening for when you have time to really enjoy it."),
+    'eclectic': ("The Eclectic", "Your taste knows no bounds. Variety is the spice of your musical life!"),
+}
+
+
+def _period_memo(func):
+    """Let a conn-taking period helper share its result within one render.
+
+    Callers that build several sections for the same period (the year in
+    review) pass one dict as memo, and each helper runs once per bounds for
+    that render. The memo belongs to the caller, so it never outlives the
+    connection or the data it was read from. Without a memo the helper
+    simply runs. A copy is returned so sections cannot mutate each other's
+    values.
+    """
+    @functools.wraps(func)
+    def wrapper(conn, start_date=None, end_date=None, memo=None):
+        if memo is None:
+            return func(conn, start_date, end_date)
+        key = (func.__name__, start_date, end_date)
+        if key not in memo:
+            memo[key] = func(conn, start_date, end_date)
+        return copy.deepcopy(memo[key])
+
+    return wrapper
+
+
+def _row_dicts(cursor: sqlite3.Cursor) -> list[dict]:
+    """Fetch all rows as plain dicts, whatever the connection's row_factory."""
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+@_period_memo
+def _basic_stats(
+    conn: sqlite3.Connection,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> dict:
+    """Period totals shared by the personality, fun facts and year in review."""
+    cursor = conn.execute(f"""
+        SELECT
+            COUNT(*) as total_plays,
+            COUNT(DISTINCT artist) as unique_artists,
+            COUNT(DISTINCT album) as unique_albums,
+            (
+                SELECT COUNT(*) FROM (
+                    SELECT DISTINCT title, artist FROM plays WHERE {TIME_RANGE}
                 )
-            """, (threshold,))
-            row = date_cursor.fetchone()
-            achieved_date = row['achieved_date'] if row else None
-
-            milestones.append({
-                'name': name,
-                'description': description,
-                'achieved_date': achieved_date,
-                'icon': icon,
-                'category': 'songs',
-                'threshold': threshold,
-            })
+            ) as unique_songs,
+            SUM(played_ms) as total_ms,
+            (
+                SELECT COUNT(*) FROM (
+                    SELECT date FROM daily_stats
+                    WHERE {_INNER_DAYS} AND play_count > 0
+                    UNION ALL
+                    SELECT DISTINCT DATE(timestamp) FROM plays
+                    WHERE {TIME_RANGE} AND {_EDGE_DAYS}
+                )
+            ) as listening_days
+        FROM plays
+        WHERE {TIME_RANGE}
+    """, (start_date or None, end_date or None) * 5)
+    return _row_dicts(cursor)[0]
 
-    # Check hours listened milestones
-    cursor = conn.execute("SELECT SUM(played_ms) as total_ms FROM plays")
-    total_ms = cursor.fetchone()['total_ms'] or 0
-    total_hours = total_ms / 1000 / 3600
 
-    for threshold, name, description, icon in hours_milestones:
-        if total_hours >= threshold:
-            # Find when cumulative hours reached this threshold
-            threshold_ms = threshold * 3600 * 1000
-            date_cursor = conn.execute("""
-                SELECT timestamp FROM (
-                    SELECT timestamp,
-                           SUM(played_ms) OVER (ORDER BY timestamp) as cumulative_ms
-                    FROM plays
-                    WHERE played_ms IS NOT NULL
-                )
-                WHERE cumulative_ms >= ?
-                LIMIT 1
-            """, (threshold_ms,))
-            row = date_cursor.fetchone()
-            achieved_date = row['timestamp'] if row else None
-
-            milestones.append({
-                'name': name,
-                'description': description,
-                'achieved_date': achieved_date,
-                'icon': icon,
-                'category': 'hours',
-                'threshold': threshold,
-            })
+@_period_memo
+def _top_song(
+    conn: sqlite3.Connection,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Optional[dict]:
+    """Most played song of the period (title, artist, plays, total_ms)."""
+    cursor = conn.execute(f"""
+        SELECT title, artist, COUNT(*) as plays, SUM(played_ms) as total_ms
+        FROM plays
+        WHERE {TIME_RANGE}
+        GROUP BY title, artist
+        ORDER BY plays DESC
+        LIMIT 1
+    """, (start_date or None, end_date or None))
+    rows = _row_dicts(cursor)
+    return rows[0] if rows else None
+
 
-    # Sort by achieved date
-    milestones.sort(key=lambda x: x['achieved_date'] or '9999')
+@_period_memo
+def _top_artists(
+    conn: sqlite3.Connection,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> list[dict]:
+    """The period's five most played artists (artist, plays), most played first."""
+    cursor = conn.execute(f"""
+        SELECT artist, COUNT(*) as plays
+        FROM plays
+        WHERE {TIME_RANGE}
+        AND artist IS NOT NULL
+        GROUP BY artist
+        ORDER BY plays DESC
+        LIMIT 5
+    """, (start_date or None, end_date or None))
+    return _row_dicts(cursor)
+
+
+_PERSONALITY_TIME_SPLITS_SQL = f"""
+    SELECT
+        SUM(CASE WHEN hour_of_day BETWEEN 22 AND 23
+                 OR hour_of_day BETWEEN 0 AND 4
+            THEN 1 ELSE 0 END) as late_night,
+        SUM(CASE WHEN hour_of_day BETWEEN 5 AND 9
+            THEN 1 ELSE 0 END) as early_morning,
+        COUNT(hour_of_day) as timed_total,
+        SUM(CASE WHEN day_of_week IN (5, 6)
+            THEN 1 ELSE 0 END) as weekend,
+        COUNT(day_of_week) as dated_total
+    FROM plays
+    WHERE {TIME_RANGE}
+"""
 
-    return milestones
 
+_PERSONALITY_ALBUM_DEPTH_SQL = f"""
+    SELECT
+        COUNT(*) as albums,
+        AVG(songs_played) as avg_songs_per_album,
+        COALESCE(SUM(songs_played >= 8), 0) as high_completion_albums
+    FROM (
+        SELECT COUNT(DISTINCT title) as songs_played
+        FROM plays
+        WHERE {TIME_RANGE}
+        AND album IS NOT NULL
+        AND album != ''
+        GROUP BY album, artist
+        HAVING songs_played >= 5
+    )
+"""
 
-# =============================================================================
-# LISTENING PERSONALITY
-# =============================================================================
 
 def get_listening_personality(
     conn: sqlite3.Connection,
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    end_date: Optional[str] = None,
+    memo: Optional[dict] = None,
 ) -> dict:
     """
     Analyze listening patterns and assign a "listener type" personality.
@@ -2222,6 +2341,8 @@ def get_listening_personality(
         conn: SQLite database connection with row_factory set.
         start_date: Start date as ISO string (YYYY-MM-DD). If None, no lower bound.
         end_date: End date as ISO string (YYYY-MM-DD). If None, no upper bound.
+        memo: Optional dict shared with the other sections of one render, so
+            the period totals are queried once.
 
     Returns a dictionary with:
         - primary_type: Main personality type
@@ -2230,28 +2351,12 @@ def get_listening_personality(
         - traits: List of specific traits/behaviors detected
         - scores: Raw scores for each personality dimension
     """
-    where_clause = "WHERE 1=1"
-    params = []
-
-    if start_date:
-        where_clause += " AND timestamp >= ?"
-        params.append(start_date)
-    if end_date:
-        where_clause += " AND timestamp <= ?"
-        params.append(end_date)
+    # Both bounds are always bound (NULL when open) so every query below keeps
+    # one SQL text whichever bounds are given
+    params = [start_date or None, end_date or None]
 
     # Get basic stats for the period
-    cursor = conn.execute(f"""
-        SELECT
-            COUNT(*) as total_plays,
-            COUNT(DISTINCT artist) as unique_artists,
-            COUNT(DISTINCT title || '-' || COALESCE(artist, '')) as unique_songs,
-            COUNT(DISTINCT album) as unique_albums,
-            SUM(played_ms) as total_ms
-        FROM plays
-        {where_clause}
-    """, params)
-    basic = cursor.fetchone()
+    basic = _basic_stats(conn, start_date, end_date, memo)
 
     if basic['total_plays'] == 0:
         return {
@@ -2278,16 +2383,7 @@ def get_listening_personality(
 
     # === LOYALIST SCORE ===
     # Few artists, many repeats per artist
-    cursor = conn.execute(f"""
-        SELECT artist, COUNT(*) as plays
-        FROM plays
-        {where_clause}
-        AND artist IS NOT NULL
-        GROUP BY artist
-        ORDER BY plays DESC
-        LIMIT 5
-    """, params)
-    top_artist_plays = cursor.fetchall()
+    top_artist_plays = _top_artists(conn, start_date, end_date, memo)
 
     if top_artist_plays:
         top_artist_share = sum(r['plays'] for r in top_artist_plays) / max(basic['total_plays'], 1)
@@ -2301,21 +2397,16 @@ def get_listening_personality(
     else:
         scores['loyalist'] = 0
 
-    # === NIGHT OWL SCORE === (use hour_of_day for local time)
-    cursor = conn.execute(f"""
-        SELECT
-            SUM(CASE WHEN hour_of_day BETWEEN 22 AND 23
-                     OR hour_of_day BETWEEN 0 AND 4
-                THEN 1 ELSE 0 END) as late_night,
-            COUNT(*) as total
-        FROM plays
-        {where_clause}
-        AND hour_of_day IS NOT NULL
-    """, params)
+    # Time-of-day and day-of-week splits for the night owl, early bird and
+    # weekend warrior scores in one pass (use hour_of_day and day_of_week for
+    # local time). day_of_week uses Python convention: 0=Monday, so weekend
+    # is 5=Saturday, 6=Sunday
+    cursor = conn.execute(_PERSONALITY_TIME_SPLITS_SQL, params)
     time_dist = cursor.fetchone()
 
-    if time_dist['total'] > 0:
-        late_night_ratio = time_dist['late_night'] / time_dist['total']
+    # === NIGHT OWL SCORE ===
+    if time_dist['timed_total'] > 0:
+        late_night_ratio = time_dist['late_night'] / time_dist['timed_total']
         scores['night_owl'] = late_night_ratio * 100
 
         if late_night_ratio > 0.3:
@@ -2325,20 +2416,9 @@ def get_listening_personality(
     else:
         scores['night_owl'] = 0
 
-    # === EARLY BIRD SCORE === (use hour_of_day for local time)
-    cursor = conn.execute(f"""
-        SELECT
-            SUM(CASE WHEN hour_of_day BETWEEN 5 AND 9
-                THEN 1 ELSE 0 END) as early_morning,
-            COUNT(*) as total
-        FROM plays
-        {where_clause}
-        AND hour_of_day IS NOT NULL
-    """, params)
-    morning_dist = cursor.fetchone()
-
-    if morning_dist['total'] > 0:
-        early_ratio = morning_dist['early_morning'] / morning_dist['total']
+    # === EARLY BIRD SCORE ===
+    if time_dist['timed_total'] > 0:
+        early_ratio = time_dist['early_morning'] / time_dist['timed_total']
         scores['early_bird'] = early_ratio * 100
 
         if early_ratio > 0.25:
@@ -2348,24 +2428,12 @@ def get_listening_personality(
 
     # === COMPLETIONIST SCORE ===
     # High album completion rate
-    cursor = conn.execute(f"""
-        SELECT
-            album,
-            artist,
-            COUNT(DISTINCT title) as songs_played,
-            COUNT(*) as total_plays
-        FROM plays
-        {where_clause}
-        AND album IS NOT NULL
-        AND album != ''
-        GROUP BY album, artist
-        HAVING songs_played >= 5
-    """, params)
-    album_completions = cursor.fetchall()
+    cursor = conn.execute(_PERSONALITY_ALBUM_DEPTH_SQL, params)
+    album_completions = cursor.fetchone()
 
-    if album_completions:
-        avg_songs_per_album = sum(r['songs_played'] for r in album_completions) / len(album_completions)
-        high_completion_albums = sum(1 for r in album_completions if r['songs_played'] >= 8)
+    if album_completions['albums']:
+        avg_songs_per_album = album_completions['avg_songs_per_album']
+        high_completion_albums = album_completions['high_completion_albums']
         scores['completionist'] = (avg_songs_per_album * 5) + (high_completion_albums * 10)
 
         if avg_songs_per_album >= 6:
@@ -2377,15 +2445,7 @@ def get_listening_personality(
 
     # === BINGE LISTENER SCORE ===
     # Listens to same song many times in a row
-    cursor = conn.execute(f"""
-        SELECT title, artist, COUNT(*) as plays
-        FROM plays
-        {where_clause}
-        GROUP BY title, artist
-        ORDER BY plays DESC
-        LIMIT 1
-    """, params)
-    top_song = cursor.fetchone()
+    top_song = _top_song(conn, start_date, end_date, memo)
 
     if top_song and top_song['plays'] > 10:
         binge_score = min(top_song['plays'] / 5, 50)
@@ -2396,21 +2456,9 @@ def get_listening_personality(
     else:
         scores['binge_listener'] = 0
 
-    # === WEEKEND WARRIOR SCORE === (use day_of_week for local time)
-    # day_of_week uses Python convention: 0=Monday, so weekend is 5=Saturday, 6=Sunday
-    cursor = conn.execute(f"""
-        SELECT
-            SUM(CASE WHEN day_of_week IN (5, 6)
-                THEN 1 ELSE 0 END) as weekend,
-            COUNT(*) as total
-        FROM plays
-        {where_clause}
-        AND day_of_week IS NOT NULL
-    """, params)
-    weekend_dist = cursor.fetchone()
-
-    if weekend_dist['total'] > 0:
-        weekend_ratio = weekend_dist['weekend'] / weekend_dist['total']
+    # === WEEKEND WARRIOR SCORE ===
+    if time_dist['dated_total'] > 0:
+        weekend_ratio = time_dist['weekend'] / time_dist['dated_total']
         # Expected is about 28.5% (2/7 days), so scale accordingly
         scores['weekend_warrior'] = max(0, (weekend_ratio - 0.285) * 200)
 
@@ -2421,12 +2469,7 @@ def get_listening_personality(
 
     # === ECLECTIC SCORE ===
     # Variety in listening patterns (changes frequently)
-    cursor = conn.execute(f"""
-        SELECT COUNT(DISTINCT DATE(timestamp)) as listening_days
-        FROM plays
-        {where_clause}
-    """, params)
-    listening_days = cursor.fetchone()['listening_days']
+    listening_days = basic['listening_days']
 
     if listening_days > 0:
         variety_per_day = basic['unique_songs'] / listening_days
@@ -2438,23 +2481,12 @@ def get_listening_personality(
         scores['eclectic'] = 0
 
     # Determine primary and secondary types
-    personality_types = {
-        'explorer': ("The Explorer", "You're on a never-ending quest for new sounds. Your library is a treasure map of musical discovery!"),
-        'loyalist': ("The Loyalist", "When you find an artist you love, you stick with them. Your dedication is legendary!"),
-        'night_owl': ("The Night Owl", "Your best listening happens when the world is asleep. The night is your concert hall."),
-        'early_bird': ("The Early Bird", "Nothing starts the day right like your favorite tunes. Morning music is your ritual!"),
-        'completionist': ("The Completionist", "Skip a track? Never! You appreciate albums as complete artistic statements."),
-        'binge_listener': ("The Obsessive", "When you love a song, you REALLY love it. Repeat button is your best friend!"),
-        'weekend_warrior': ("The Weekend Warrior", "You save your serious listening for when you have time to really enjoy it."),
-        'eclectic': ("The Eclectic", "Your taste knows no bounds. Variety is the spice of your musical life!"),
-    }
-
     sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
     primary_key = sorted_scores[0][0] if sorted_scores else 'explorer'
     secondary_key = sorted_scores[1][0] if len(sorted_scores) > 1 and sorted_scores[1][1] > 20 else None
 
-    primary_name, primary_desc = personality_types.get(primary_key, ("Music Lover", "You just love music!"))
-    secondary_name = personality_types.get(secondary_key, (None, None))[0] if secondary_key else None
+    primary_name, primary_desc = _PERSONALITY_TYPES.get(primary_key, ("Music Lover", "You just love music!"))
+    secondary_name = _PERSONALITY_TYPES.get(secondary_key, (None, None))[0] if secondary_key else None
 
     return {
         'primary_type': primary_name,
@@ -2469,10 +2501,74 @@ def get_listening_personality(
 # FUN FACTS
 # =============================================================================
 
+# Spoken name of each hour_of_day for the peak-hour fact
+_HOUR_LABELS = (
+    ["midnight"]
+    + [f"{hour} AM" for hour in range(1, 12)]
+    + ["noon"]
+    + [f"{hour - 12} PM" for hour in range(13, 24)]
+)
+
+
+_NEW_ARTISTS_SQL = f"""
+    SELECT COUNT(*) as new_artists
+    FROM (
+        SELECT DISTINCT artist
+        FROM plays
+        WHERE {TIME_RANGE}
+        AND artist IS NOT NULL
+    ) period_artists
+    WHERE NOT EXISTS (
+        SELECT 1 FROM plays earlier
+        WHERE earlier.artist = period_artists.artist
+        AND earlier.timestamp < ?
+    )
+"""
+
+
+_BUSIEST_DAY_PLAYS_SQL = f"""
+    SELECT play_date, plays
+    FROM (
+        SELECT date as play_date, play_count as plays
+        FROM daily_stats
+        WHERE {_INNER_DAYS}
+        UNION ALL
+        SELECT DATE(timestamp), COUNT(*)
+        FROM plays
+        WHERE {TIME_RANGE} AND {_EDGE_DAYS}
+        GROUP BY DATE(timestamp)
+    )
+    ORDER BY plays DESC, play_date DESC
+    LIMIT 1
+"""
+
+
+_PEAK_HOUR_SQL = f"""
+    SELECT hour_of_day as hour, COUNT(*) as plays
+    FROM plays
+    WHERE {TIME_RANGE}
+    AND hour_of_day IS NOT NULL
+    GROUP BY hour_of_day
+    ORDER BY plays DESC
+    LIMIT 1
+"""
+
+
+_FUN_FACT_LONGEST_SQL = f"""
+    SELECT title, artist, duration_ms
+    FROM plays
+    WHERE {TIME_RANGE}
+    AND duration_ms IS NOT NULL
+    ORDER BY duration_ms DESC
+    LIMIT 1
+"""
+
+
 def get_fun_facts(
     conn: sqlite3.Connection,
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    end_date: Optional[str] = None,
+    memo: Optional[dict] = None,
 ) -> list[str]:
     """
     Generate interesting and fun facts about listening habits.
@@ -2481,28 +2577,19 @@ def get_fun_facts(
         conn: SQLite database connection with row_factory set.
         start_date: Start date as ISO string (YYYY-MM-DD). If None, no lower bound.
         end_date: End date as ISO string (YYYY-MM-DD). If None, no upper bound.
+        memo: Optional dict shared with the other sections of one render, so
+            the period totals are queried once.
 
     Returns a list of fun fact strings.
     """
-    where_clause = "WHERE 1=1"
-    params = []
-
-    if start_date:
-        where_clause += " AND timestamp >= ?"
-        params.append(start_date)
-    if end_date:
-        where_clause += " AND timestamp <= ?"
-        params.append(end_date)
+    # Both bounds are always bound (NULL when open) so every query below keeps
+    # one SQL text whichever bounds are given
+    params = [start_date or None, end_date or None]
 
     facts = []
 
     # Total listening time facts
-    cursor = conn.execute(f"""
-        SELECT SUM(played_ms) as total_ms, COUNT(*) as total_plays
-        FROM plays
-        {where_clause}
-    """, params)
-    totals = cursor.fetchone()
+    totals = _basic_stats(conn, start_date, end_date, memo)
     total_ms = totals['total_ms'] or 0
     total_plays = totals['total_plays'] or 0
 
@@ -2526,16 +2613,14 @@ def get_fun_facts(
         marathon_movies = total_hours / 2.5  # Average movie length
         facts.append(f"Instead of music, you could have watched {marathon_movies:.0f} movies!")
 
+    # The totals bound what the top song and biggest day can reach: every
+    # other song (or day) takes at least one play, so skip those queries when
+    # the fact's threshold is out of reach
+    max_song_plays = total_plays - totals['unique_songs'] + 1
+    max_day_plays = total_plays - totals['listening_days'] + 1
+
     # Top song facts
-    cursor = conn.execute(f"""
-        SELECT title, artist, COUNT(*) as plays, SUM(played_ms) as total_ms
-        FROM plays
-        {where_clause}
-        GROUP BY title, artist
-        ORDER BY plays DESC
-        LIMIT 1
-    """, params)
-    top_song = cursor.fetchone()
+    top_song = _top_song(conn, start_date, end_date, memo) if max_song_plays >= 5 else None
 
     if top_song and top_song['plays'] >= 5:
         song_hours = (top_song['total_ms'] or 0) / 1000 / 3600
@@ -2548,84 +2633,40 @@ def get_fun_facts(
 
     # Discovery facts - new artists in this period vs before
     if start_date:
-        cursor = conn.execute(f"""
-            SELECT COUNT(DISTINCT artist) as new_artists
-            FROM plays
-            {where_clause}
-            AND artist IS NOT NULL
-            AND artist NOT IN (
-                SELECT DISTINCT artist FROM plays
-                WHERE timestamp < ? AND artist IS NOT NULL
-            )
-        """, params + [start_date])
+        # Anti-join each artist of the period against idx_plays_artist_ts
+        # rather than materializing every artist heard before it
+        cursor = conn.execute(_NEW_ARTISTS_SQL, params + [start_date])
         new_artists = cursor.fetchone()['new_artists']
 
         if new_artists > 0:
             facts.append(f"You discovered {new_artists} new artist{'s' if new_artists != 1 else ''} in this period!")
 
-    # Streak facts
-    cursor = conn.execute(f"""
-        SELECT DATE(timestamp) as play_date, COUNT(*) as plays
-        FROM plays
-        {where_clause}
-        GROUP BY DATE(timestamp)
-        ORDER BY plays DESC
-        LIMIT 1
-    """, params)
-    biggest_day = cursor.fetchone()
+    # Streak facts (whole days from the daily_stats rollup, edge days from plays)
+    biggest_day = None
+    if max_day_plays >= 10:
+        cursor = conn.execute(_BUSIEST_DAY_PLAYS_SQL, params * 3)
+        biggest_day = cursor.fetchone()
 
     if biggest_day and biggest_day['plays'] >= 10:
         facts.append(f"Your biggest listening day had {biggest_day['plays']} plays on {biggest_day['play_date']}!")
 
     # Time of day facts (use hour_of_day for local time)
-    cursor = conn.execute(f"""
-        SELECT hour_of_day as hour, COUNT(*) as plays
-        FROM plays
-        {where_clause}
-        AND hour_of_day IS NOT NULL
-        GROUP BY hour_of_day
-        ORDER BY plays DESC
-        LIMIT 1
-    """, params)
+    cursor = conn.execute(_PEAK_HOUR_SQL, params)
     peak_hour = cursor.fetchone()
 
     if peak_hour:
-        hour = peak_hour['hour']
-        if hour == 0:
-            time_str = "midnight"
-        elif hour < 12:
-            time_str = f"{hour} AM"
-        elif hour == 12:
-            time_str = "noon"
-        else:
-            time_str = f"{hour - 12} PM"
+        time_str = _HOUR_LABELS[peak_hour['hour']]
         facts.append(f"Your peak listening hour is {time_str}!")
 
     # Unique combinations
-    cursor = conn.execute(f"""
-        SELECT COUNT(DISTINCT title || '-' || COALESCE(artist, '')) as unique_songs,
-               COUNT(DISTINCT artist) as unique_artists,
-               COUNT(DISTINCT album) as unique_albums
-        FROM plays
-        {where_clause}
-    """, params)
-    uniques = cursor.fetchone()
-
-    if uniques['unique_artists'] >= 10:
-        facts.append(f"You listened to {uniques['unique_artists']} different artists - that's a diverse taste!")
+    if totals['unique_artists'] >= 10:
+        facts.append(f"You listened to {totals['unique_artists']} different artists - that's a diverse taste!")
 
-    if uniques['unique_albums'] >= 20:
-        facts.append(f"You explored {uniques['unique_albums']} different albums!")
+    if totals['unique_albums'] >= 20:
+        facts.append(f"You explored {totals['unique_albums']} different albums!")
 
     # Long song fact
-    cursor = conn.execute(f"""
-        SELECT title, artist, duration_ms
-        FROM plays
-        {where_clause}
-        AND duration_ms IS NOT NULL
-        ORDER BY duration_ms DESC
-        LIMIT 1
-    """, params)
+    cursor = conn.execute(_FUN_FACT_LONGEST_SQL, params)
     longest_song = cursor.fetchone()
 
     if longest_song and longest_song['duration_ms']:
@@ -2634,29 +2675,14 @@ def get_fun_facts(
             facts.append(f'The longest track you played was "{longest_song["title"]}" at {duration_min:.1f} minutes!')
 
     # Average session length estimate
-    cursor = conn.execute(f"""
-        SELECT COUNT(*) as plays, COUNT(DISTINCT DATE(timestamp)) as days
-        FROM plays
-        {where_clause}
-    """, params)
-    session_data = cursor.fetchone()
-
-    if session_data['days'] > 0:
-        avg_plays_per_day = session_data['plays'] / session_data['days']
+    if totals['listening_days'] > 0:
+        avg_plays_per_day = total_plays / totals['listening_days']
         if avg_plays_per_day >= 5:
             facts.append(f"On average, you played {avg_plays_per_day:.1f} tracks per listening day!")
 
     # Artist loyalty fact
-    cursor = conn.execute(f"""
-        SELECT artist, COUNT(*) as plays
-        FROM plays
-        {where_clause}
-        AND artist IS NOT NULL
-        GROUP BY artist
-        ORDER BY plays DESC
-        LIMIT 1
-    """, params)
-    top_artist = cursor.fetchone()
+    top_artists = _top_artists(conn, start_date, end_date, memo)
+    top_artist = top_artists[0] if top_artists else None
 
     if top_artist and total_plays > 0:
         artist_percent = (top_artist['plays'] / total_plays) * 100
@@ -2670,6 +2696,47 @@ def get_fun_facts(
 # YEAR IN REVIEW
 # =============================================================================
 
+# Top artists, songs and albums of a period from one pass over plays: the
+# period is grouped once per (title, artist, album) and each top-10 list
+# regroups those track totals. Rows are tagged with the list they belong to,
+# and ties rank in key order.
+_TOP_LISTS_SQL = """
+    WITH track_totals AS MATERIALIZED (
+        SELECT title, artist, album, COUNT(*) as plays, SUM(played_ms) as total_ms
+        FROM plays
+        WHERE timestamp >= ? AND timestamp <= ?
+        GROUP BY title, artist, album
+    )
+    SELECT * FROM (
+        SELECT 'artist' as list, artist as name, NULL as artist,
+               SUM(plays) as plays, NULL as unique_tracks, SUM(total_ms) as total_ms
+        FROM track_totals
+        WHERE artist IS NOT NULL
+        GROUP BY artist
+        ORDER BY plays DESC, artist
+        LIMIT 10
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'song', title, artist, SUM(plays) as plays, NULL, SUM(total_ms)
+        FROM track_totals
+        GROUP BY title, artist
+        ORDER BY plays DESC, title, artist
+        LIMIT 10
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'album', album, artist, SUM(plays) as plays,
+               COUNT(DISTINCT title), SUM(total_ms)
+        FROM track_totals
+        WHERE album IS NOT NULL AND album != ''
+        GROUP BY album, artist
+        ORDER BY plays DESC, album, artist
+        LIMIT 10
+    )
+"""
+
+
 def get_year_in_review_summary(conn: sqlite3.Connection, year: int) -> dict:
     """
     Generate a comprehensive yearly summary combining all metrics.
@@ -2697,18 +2764,9 @@ def get_year_in_review_summary(conn: sqlite3.Connection, year: int) -> dict:
     params = [start_date, end_date]
 
     # === TOTAL STATS ===
-    cursor = conn.execute(f"""
-        SELECT
-            COUNT(*) as total_plays,
-            COUNT(DISTINCT artist) as unique_artists,
-            COUNT(DISTINCT album) as unique_albums,
-            COUNT(DISTINCT title || '-' || COALESCE(artist, '')) as unique_songs,
-            SUM(played_ms) as total_ms,
-            COUNT(DISTINCT DATE(timestamp)) as listening_days
-        FROM plays
-        {where_clause}
-    """, params)
-    total_stats = dict(cursor.fetchone())
+    # Shared with the personality and fun facts sections below
+    memo = {}
+    total_stats = _basic_stats(conn, start_date, end_date, memo)
 
     if total_stats['total_plays'] == 0:
         return {
@@ -2717,7 +2775,7 @@ def get_year_in_review_summary(conn: sqlite3.Connection, year: int) -> dict:
             'top_artists': [],
             'top_songs': [],
             'top_albums': [],
-            'personality': get_listening_personality(conn, start_date, end_date),
+            'personality': get_listening_personality(conn, start_date, end_date, memo),
             'milestones_earned': [],
             'fun_facts': ["No listening data for this year yet!"],
             'monthly_breakdown': [],
@@ -2726,45 +2784,35 @@ def get_year_in_review_summary(conn: sqlite3.Connection, year: int) -> dict:
 
     total_stats['total_hours'] = (total_stats['total_ms'] or 0) / 1000 / 3600
 
-    # === TOP ARTISTS ===
-    cursor = conn.execute(f"""
-        SELECT artist, COUNT(*) as plays, SUM(played_ms) as total_ms
-        FROM plays
-        {where_clause}
-        AND artist IS NOT NULL
-        GROUP BY artist
-        ORDER BY plays DESC
-        LIMIT 10
-    """, params)
-    top_artists = [dict(row) for row in cursor.fetchall()]
-
-    # === TOP SONGS ===
-    cursor = conn.execute(f"""
-        SELECT title, artist, COUNT(*) as plays, SUM(played_ms) as total_ms
-        FROM plays
-        {where_clause}
-        GROUP BY title, artist
-        ORDER BY plays DESC
-        LIMIT 10
-    """, params)
-    top_songs = [dict(row) for row in cursor.fetchall()]
-
-    # === TOP ALBUMS ===
-    cursor = conn.execute(f"""
-        SELECT album, artist, COUNT(*) as plays,
-               COUNT(DISTINCT title) as unique_tracks,
-               SUM(played_ms) as total_ms
-        FROM plays
-        {where_clause}
-        AND album IS NOT NULL AND album != ''
-        GROUP BY album, artist
-        ORDER BY plays DESC
-        LIMIT 10
-    """, params)
-    top_albums = [dict(row) for row in cursor.fetchall()]
+    # === TOP ARTISTS, SONGS AND ALBUMS ===
+    top_artists = []
+    top_songs = []
+    top_albums = []
+    for row in conn.execute(_TOP_LISTS_SQL, params):
+        if row['list'] == 'artist':
+            top_artists.append({
+                'artist': row['name'],
+                'plays': row['plays'],
+                'total_ms': row['total_ms'],
+            })
+        elif row['list'] == 'song':
+            top_songs.append({
+                'title': row['name'],
+                'artist': row['artist'],
+                'plays': row['plays'],
+                'total_ms': row['total_ms'],
+            })
+        else:
+            top_albums.append({
+                'album': row['name'],
+                'artist': row['artist'],
+                'plays': row['plays'],
+                'unique_tracks': row['unique_tracks'],
+                'total_ms': row['total_ms'],
+            })
 
     # === PERSONALITY ===
-    personality = get_listening_personality(conn, start_date, end_date)
+    personality = get_listening_personality(conn, start_date, end_date, memo)
 
     # === MILESTONES EARNED THIS YEAR ===
     all_milestones = get_milestones(conn)
@@ -2774,7 +2822,7 @@ def get_year_in_review_summary(conn: sqlite3.Connection, year: int) -> dict:
     ]
 
     # === FUN FACTS ===
-    fun_facts = get_fun_facts(conn, start_date, end_date)
+    fun_facts = get_fun_facts(conn, start_date, end_date, memo)
 
     # === MONTHLY BREAKDOWN ===
     cursor = conn.execute(f"""
@@ -2805,33 +2853,33 @@ def get_year_in_review_summary(conn: sqlite3.Connection, year: int) -> dict:
     # === LISTENING JOURNEY (Key Moments) ===
     listening_journey = []
 
-    # First play of the year
+    # First and most recent play of the year: two index seeks in one query
     cursor = conn.execute(f"""
-        SELECT title, artist, timestamp
-        FROM plays
-        {where_clause}
-        ORDER BY timestamp ASC
-        LIMIT 1
-    """, params)
-    first_play = cursor.fetchone()
-    if first_play:
+        SELECT * FROM (
+            SELECT title, artist, timestamp
+            FROM plays
+            {where_clause}
+            ORDER BY timestamp ASC
+            LIMIT 1
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT title, artist, timestamp
+            FROM plays
+            {where_clause}
+            ORDER BY timestamp DESC
+            LIMIT 1
+        )
+    """, params * 2)
+    first_last = cursor.fetchall()
+    if first_last:
+        first_play, last_play = first_last
         listening_journey.append({
             'moment': 'First Song of the Year',
             'title': first_play['title'],
             'artist': first_play['artist'],
             'date': first_play['timestamp'],
         })
-
-    # Last play of the year (or most recent)
-    cursor = conn.execute(f"""
-        SELECT title, artist, timestamp
-        FROM plays
-        {where_clause}
-        ORDER BY timestamp DESC
-        LIMIT 1
-    """, params)
-    last_play = cursor.fetchone()
-    if last_play:
         listening_journey.append({
             'moment': 'Most Recent Song',
             'title': last_play['title'],
@@ -2839,22 +2887,21 @@ def get_year_in_review_summary(conn: sqlite3.Connection, year: int) -> dict:
             'date': last_play['timestamp'],
         })
 
-    # Biggest listening day
-    cursor = conn.execute(f"""
-        SELECT DATE(timestamp) as date, COUNT(*) as plays, SUM(played_ms) as total_ms
-        FROM plays
-        {where_clause}
-        GROUP BY DATE(timestamp)
-        ORDER BY plays DESC
-        LIMIT 1
-    """, params)
-    biggest_day = cursor.fetchone()
+    # Biggest listening day, picked from the daily_stats rollup; only that
+    # day's plays are read back for its listening time
+    biggest_day = conn.execute(_BUSIEST_DAY_PLAYS_SQL, params * 3).fetchone()
     if biggest_day:
+        day_ms = conn.execute(f"""
+            SELECT SUM(played_ms)
+            FROM plays
+            {where_clause}
+            AND DATE(timestamp) = ?
+        """, params + [biggest_day['play_date']]).fetchone()[0]
         listening_journey.append({
             'moment': 'Biggest Listening Day',
             'plays': biggest_day['plays'],
-            'hours': (biggest_day['total_ms'] or 0) / 1000 / 3600,
-            'date': biggest_day['date'],
+            'hours': (day_ms or 0) / 1000 / 3600,
+            'date': biggest_day['play_date'],
         })
 
     # First new artist discovery of the year
@@ -2863,11 +2910,12 @@ def get_year_in_review_summary(conn: sqlite3.Connection, year: int) -> dict:
         FROM plays
         {where_clause}
         AND artist IS NOT NULL
-        AND artist NOT IN (
-            SELECT DISTINCT artist FROM plays
-            WHERE timestamp < ? AND artist IS NOT NULL
-        )
         GROUP BY artist
+        HAVING NOT EXISTS (
+            SELECT 1 FROM plays earlier
+            WHERE earlier.artist = plays.artist
+            AND earlier.timestamp < ?
+        )
         ORDER BY first_play ASC
         LIMIT 1
     """, params + [start_date])
@@ -3026,9 +3074,23 @@ def display_year_in_review(conn: sqlite3.Connection, year: int):
     print("\n" + "*" * 60 + "\n")
 
 
+def _round_floats(value, ndigits: int = 2):
+    """Round every float in a nested result for display/serialization.
+
+    The time-based analytics return unrounded floats; formatting happens
+    here, once, at the output boundary.
+    """
+    if isinstance(value, float):
+        return round(value, ndigits)
+    if isinstance(value, dict):
+        return {k: _round_floats(v, ndigits) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_round_floats(v, ndigits) for v in value]
+    return value
+
+
 if __name__ == "__main__":
     # Example usage
-    import json
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -3062,7 +3124,7 @@ Examples:
         print("Running time-based analytics...")
         print("-" * 50)
         results = get_time_analytics()
-        print(json.dumps(results, indent=2, default=str))
+        print(json.dumps(_round_floats(results), indent=2, default=str))
 
         print("\nRunning track behavior analytics...")
         print("-" * 50)
@@ -19,6 +19,7 @@ Features computed:
 
 import os
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional, List
 
@@ -33,6 +34,26 @@ import librosa
 # Supported audio extensions
 AUDIO_EXTENSIONS = {'.mp3', '.flac', '.ogg', '.wav', '.m4a', '.aac', '.wma', '.opus'}
 
+# Analyzed files saved per database transaction in analyze_library
+SAVE_BATCH_SIZE = 50
+
+# Decoding settings for analyze_file. The spectral normalizers below are in
+# Hz and reach up to 10 kHz (rolloff), so the rate must keep a Nyquist
+# frequency above that; features are cached per file, so changing either
+# value makes new results inconsistent with already-analyzed files.
+ANALYSIS_SAMPLE_RATE = 22050
+ANALYSIS_DURATION = 180  # First 3 min
+
+
+def _key_templates(scale: List[int]) -> np.ndarray:
+    """Scale template rotated to all 12 keys (row = key), z-scored per row."""
+    rotations = np.stack([np.roll(np.array(scale, dtype=float), shift) for shift in range(12)])
+    return (rotations - rotations.mean(axis=1, keepdims=True)) / rotations.std(axis=1, keepdims=True)
+
+
+_MAJOR_KEY_TEMPLATES = _key_templates([1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 1])  # Major scale
+_MINOR_KEY_TEMPLATES = _key_templates([1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0])  # Minor scale
+
 
 def analyze_file(file_path: str) -> Optional[Dict]:
     """
@@ -46,7 +67,7 @@ def analyze_file(file_path: str) -> Optional[Dict]:
     """
     try:
         # Load audio file
-        y, sr = librosa.load(file_path, sr=22050, mono=True, duration=180)  # First 3 min
+        y, sr = librosa.load(file_path, sr=ANALYSIS_SAMPLE_RATE, mono=True, duration=ANALYSIS_DURATION)
 
         if len(y) == 0:
             return None
@@ -54,6 +75,12 @@ def analyze_file(file_path: str) -> Optional[Dict]:
         # Basic feature extraction
         features = {}
 
+        # Onset envelope, shared by danceability, speechiness and time
+        # signature. beat_track keeps computing its own: it aggregates with
+        # the median rather than the mean, so passing this one in would
+        # change the detected beats.
+        onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+
         # Tempo (BPM)
         tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
         features['tempo'] = float(tempo) if not hasattr(tempo, '__len__') else float(tempo[0])
@@ -74,11 +101,6 @@ def analyze_file(file_path: str) -> Optional[Dict]:
         # Chroma features for key detection
         chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
 
-        # Harmonic and percussive separation
-        y_harmonic, y_percussive = librosa.effects.hpss(y)
-        harmonic_ratio = np.sum(np.abs(y_harmonic)) / (np.sum(np.abs(y)) + 1e-10)
-        percussive_ratio = np.sum(np.abs(y_percussive)) / (np.sum(np.abs(y)) + 1e-10)
-
         # === Energy (0.0-1.0) ===
         # Based on RMS energy, spectral bandwidth, and overall loudness
         rms_mean = np.mean(rms)
@@ -94,7 +116,6 @@ def analyze_file(file_path: str) -> Optional[Dict]:
         tempo_score = max(0, tempo_score)
 
         # Beat strength from onset envelope
-        onset_env = librosa.onset.onset_strength(y=y, sr=sr)
         beat_strength = np.mean(onset_env[beat_frames]) if len(beat_frames) > 0 else 0
         beat_strength_normalized = min(1.0, beat_strength / 10)
 
@@ -112,23 +133,19 @@ def analyze_file(file_path: str) -> Optional[Dict]:
         # Musical positivity - higher values = happier
         # Based on mode (major/minor), spectral centroid, and tempo
         chroma_mean = np.mean(chroma, axis=1)
-        major_template = np.array([1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 1])  # Major scale
-        minor_template = np.array([1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0])  # Minor scale
-
-        # Find best key fit
-        best_major_corr = 0
-        best_minor_corr = 0
-        best_key = 0
-        for shift in range(12):
-            major_shifted = np.roll(major_template, shift)
-            minor_shifted = np.roll(minor_template, shift)
-            major_corr = np.corrcoef(chroma_mean, major_shifted)[0, 1]
-            minor_corr = np.corrcoef(chroma_mean, minor_shifted)[0, 1]
-            if major_corr > best_major_corr:
-                best_major_corr = major_corr
-                best_key = shift
-            if minor_corr > best_minor_corr:
-                best_minor_corr = minor_corr
+
+        # Find best key fit: Pearson correlation against every rotation at
+        # once (mean of products of z-scores)
+        chroma_std = np.std(chroma_mean)
+        if chroma_std > 0:
+            chroma_z = (chroma_mean - np.mean(chroma_mean)) / chroma_std
+            major_corrs = _MAJOR_KEY_TEMPLATES @ chroma_z / 12
+            minor_corrs = _MINOR_KEY_TEMPLATES @ chroma_z / 12
+        else:
+            major_corrs = minor_corrs = np.zeros(12)
+        best_key = int(np.argmax(major_corrs)) if major_corrs.max() > 0 else 0
+        best_major_corr = max(0, float(major_corrs.max()))
+        best_minor_corr = max(0, float(minor_corrs.max()))
 
         mode_score = 1.0 if best_major_corr > best_minor_corr else 0.3
 
@@ -175,7 +192,7 @@ def analyze_file(file_path: str) -> Optional[Dict]:
         flatness_score = np.mean(spectral_flatness)
 
         # Check for speech-like rhythm (syllables ~3-5 per second)
-        onset_rate = len(librosa.onset.onset_detect(y=y, sr=sr)) / (len(y) / sr)
+        onset_rate = len(librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr)) / (len(y) / sr)
         speech_rhythm_score = 1.0 - abs(onset_rate - 4) / 4
         speech_rhythm_score = max(0, speech_rhythm_score)
 
@@ -197,8 +214,6 @@ def analyze_file(file_path: str) -> Optional[Dict]:
         # Estimate based on beat groupings
         if len(beat_frames) > 2:
             # Look for strong beats at regular intervals
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-
             # Try different time signatures
             time_sig_scores = {}
             for ts in [3, 4, 6]:
@@ -248,13 +263,18 @@ def find_audio_files(music_dir: str) -> List[str]:
     return [str(f) for f in audio_files]
 
 
-def analyze_library(music_dir: str, progress_callback=None) -> Dict[str, Dict]:
+def analyze_library(music_dir: str, progress_callback=None,
+                    max_workers: Optional[int] = None) -> Dict[str, Dict]:
     """
     Analyze all audio files in a music library.
 
+    Files are analyzed in parallel worker processes; results are saved to
+    the database from this process only.
+
     Args:
         music_dir: Path to music directory
         progress_callback: Optional callback(current, total, file_path)
+        max_workers: Worker processes to use (defaults to the CPU count)
 
     Returns:
         Dictionary mapping file paths to their features
@@ -269,38 +289,56 @@ def analyze_library(music_dir: str, progress_callback=None) -> Dict[str, Dict]:
         return {}
 
     results = {}
+    pending = []
     analyzed = 0
-    skipped = 0
     failed = 0
 
     print(f"Found {total} audio files to analyze")
 
-    for i, file_path in enumerate(audio_files):
-        # Check if already analyzed (caching)
-        if db.is_file_analyzed(file_path):
-            skipped += 1
-            if progress_callback:
-                progress_callback(i + 1, total, file_path, "skipped")
-            continue
-
-        # Analyze the file
-        features = analyze_file(file_path)
-
-        if features:
-            # Save to database
-            db.save_audio_features(file_path, features)
-            results[file_path] = features
-            analyzed += 1
-            if progress_callback:
-                progress_callback(i + 1, total, file_path, "analyzed")
-        else:
-            failed += 1
-            if progress_callback:
-                progress_callback(i + 1, total, file_path, "failed")
-
-        # Progress output
-        if (i + 1) % 10 == 0 or i == total - 1:
-            print(f"Progress: {i + 1}/{total} files (analyzed: {analyzed}, skipped: {skipped}, failed: {failed})")
+    # Skip files already analyzed (caching), looked up in one pass
+    analyzed_files = db.get_analyzed_files(audio_files)
+    to_analyze = [f for f in audio_files if f not in analyzed_files]
+    skipped = total - len(to_analyze)
+
+    if progress_callback:
+        done = 0
+        for file_path in audio_files:
+            if file_path in analyzed_files:
+                done += 1
+                progress_callback(done, total, file_path, "skipped")
+
+    if to_analyze:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            analyzed_features = executor.map(analyze_file, to_analyze, chunksize=4)
+            try:
+                for i, (file_path, features) in enumerate(zip(to_analyze, analyzed_features), start=skipped):
+                    if features:
+                        # Save to database in batches so each file isn't its own commit
+                        pending.append((file_path, features))
+                        if len(pending) >= SAVE_BATCH_SIZE:
+                            db.save_audio_features_batch(pending)
+                            pending = []
+                        results[file_path] = features
+                        analyzed += 1
+                        if progress_callback:
+                            progress_callback(i + 1, total, file_path, "analyzed")
+                    else:
+                        failed += 1
+                        if progress_callback:
+                            progress_callback(i + 1, total, file_path, "failed")
+
+                    # Progress output
+                    if (i + 1) % 10 == 0 or i == total - 1:
+                        print(f"Progress: {i + 1}/{total} files (analyzed: {analyzed}, skipped: {skipped}, failed: {failed})")
+            except BaseException:
+                # Don't let shutdown run the files still queued; their
+                # results would never be saved
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            finally:
+                # Save what was analyzed even if the run is interrupted
+                if pending:
+                    db.save_audio_features_batch(pending)
 
     print(f"\nAnalysis complete!")
     print(f"  Analyzed: {analyzed} files")
@@ -349,9 +387,9 @@ def display_library_audio_stats():
     """Display aggregate statistics about analyzed audio files."""
     import db
 
-    all_features = db.get_all_audio_features()
+    summary = db.get_audio_feature_summary()
 
-    if not all_features:
+    if not summary['total_files']:
         print("No audio files have been analyzed yet.")
         print("Run: music-stats --analyze /path/to/music")
         return
@@ -360,38 +398,25 @@ def display_library_audio_stats():
     print("  AUDIO FEATURES SUMMARY")
     print('=' * 50)
 
-    print(f"\n  Total analyzed files: {len(all_features)}")
+    print(f"\n  Total analyzed files: {summary['total_files']}")
 
-    # Calculate averages
-    tempos = [f['tempo'] for f in all_features if f['tempo']]
-    energies = [f['energy'] for f in all_features if f['energy']]
-    danceabilities = [f['danceability'] for f in all_features if f['danceability']]
-    valences = [f['valence'] for f in all_features if f['valence']]
-
-    if tempos:
-        print(f"\n  Average Tempo:        {np.mean(tempos):.1f} BPM (range: {min(tempos):.0f}-{max(tempos):.0f})")
-    if energies:
-        print(f"  Average Energy:       {np.mean(energies):.2f}")
-    if danceabilities:
-        print(f"  Average Danceability: {np.mean(danceabilities):.2f}")
-    if valences:
-        print(f"  Average Valence:      {np.mean(valences):.2f}")
+    if summary['avg_tempo'] is not None:
+        print(f"\n  Average Tempo:        {summary['avg_tempo']:.1f} BPM (range: {summary['min_tempo']:.0f}-{summary['max_tempo']:.0f})")
+    if summary['avg_energy'] is not None:
+        print(f"  Average Energy:       {summary['avg_energy']:.2f}")
+    if summary['avg_danceability'] is not None:
+        print(f"  Average Danceability: {summary['avg_danceability']:.2f}")
+    if summary['avg_valence'] is not None:
+        print(f"  Average Valence:      {summary['avg_valence']:.2f}")
 
     # Key distribution
-    keys = [f['key'] for f in all_features if f['key'] is not None]
-    modes = [f['mode'] for f in all_features if f['mode'] is not None]
-
-    if keys:
+    if summary['key_counts']:
         key_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        from collections import Counter
-        key_counts = Counter(keys)
-        most_common_key = key_counts.most_common(1)[0]
+        most_common_key = summary['key_counts'][0]
         print(f"\n  Most common key:      {key_names[most_common_key[0]]} ({most_common_key[1]} tracks)")
 
-    if modes:
-        major_count = sum(1 for m in modes if m == 1)
-        minor_count = len(modes) - major_count
-        print(f"  Major vs Minor:       {major_count} major, {minor_count} minor")
+    if summary['major_count'] or summary['minor_count']:
+        print(f"  Major vs Minor:       {summary['major_count']} major, {summary['minor_count']} minor")
 
     print()
 
@@ -2,17 +2,87 @@
 """Database utilities for music analytics."""
 
 import sqlite3
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
 
 DB_PATH = Path(__file__).parent / "listens.db"
 
+_read_connections = threading.local()
+
+
+# daily_stats counters and the per-play value each one sums; {row} is the
+# plays row (NEW/OLD in triggers). Skips are plays under 30 seconds (or
+# under half the track for half_skips); "rated" plays have both played_ms
+# and a positive duration_ms, and completion is capped at 100%.
+DAILY_STATS_COLUMNS = [
+    ("play_count", "1"),
+    ("total_ms", "{row}.effective_ms"),
+    ("timed_plays", "{row}.played_ms IS NOT NULL"),
+    ("short_plays", "COALESCE({row}.played_ms < 30000, 0)"),
+    ("rated_plays", "COALESCE({row}.played_ms IS NOT NULL AND {row}.duration_ms > 0, 0)"),
+    ("half_skips", "COALESCE({row}.duration_ms > 0 AND {row}.played_ms * 1.0 / {row}.duration_ms < 0.5, 0)"),
+    ("full_listens", "COALESCE({row}.duration_ms > 0 AND {row}.played_ms * 1.0 / {row}.duration_ms >= 0.9, 0)"),
+    ("completion_sum",
+     "CASE WHEN {row}.played_ms IS NOT NULL AND {row}.duration_ms > 0"
+     " THEN MIN({row}.played_ms * 1.0 / {row}.duration_ms, 1.0) * 100 ELSE 0 END"),
+    ("sized_plays", "COALESCE({row}.duration_ms > 0, 0)"),
+    ("duration_sum", "CASE WHEN {row}.duration_ms > 0 THEN {row}.duration_ms ELSE 0 END"),
+]
+
+
+def _daily_stats_type(name: str) -> str:
+    """Column type for a daily_stats counter."""
+    return "REAL" if name == "completion_sum" else "INTEGER"
+
+
+# Open-ended ranges bind NULL and fall back to bounds that admit every
+# timestamp, so each query keeps one fixed SQL text (and one cached prepared
+# statement per connection) while still using the timestamp index. The upper
+# sentinel must not look numeric: the DATETIME column's affinity would turn
+# '9999' into an integer, which sorts below every text timestamp.
+TIME_RANGE = "timestamp >= COALESCE(?, '') AND timestamp <= COALESCE(?, '9999-12-31T23:59:59')"
+
+
+def time_range_params(
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> list:
+    """Bind values for TIME_RANGE; None leaves that side of the range open."""
+    return [
+        start_date.isoformat() if start_date else None,
+        end_date.isoformat() if end_date else None,
+    ]
+
 
 def get_connection() -> sqlite3.Connection:
     """Get a database connection with row factory."""
-    conn = sqlite3.connect(DB_PATH)
+    # Analytics queries keep fixed SQL text (open ranges bind NULL rather
+    # than changing the WHERE clause), so with a cache large enough to hold
+    # them all every call re-runs an already prepared statement
+    conn = sqlite3.connect(DB_PATH, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    # WAL lets analytics reads run alongside the tracker's writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """Get this thread's shared connection for analytics reads.
+
+    The connection is opened on first use and reused for the life of the
+    thread, so repeated analytics calls skip connection setup and keep their
+    page cache and prepared statements warm. Callers must not close it.
+    """
+    conn = getattr(_read_connections, "conn", None)
+    if conn is None:
+        conn = get_connection()
+        _read_connections.conn = conn
     return conn
 
 
@@ -65,10 +135,12 @@ def init_db():
         ("on_battery", "INTEGER"),  # 1 if on battery power
         ("player_name", "TEXT"),  # Which player was used
         ("is_local", "INTEGER"),  # 1 for local files, 0 for streaming/non-local
+        # Listening time credited to a play (played time, else track length)
+        ("effective_ms", "INTEGER GENERATED ALWAYS AS (COALESCE(played_ms, duration_ms, 0)) VIRTUAL"),
     ]
 
-    # Get existing columns
-    cursor = conn.execute("PRAGMA table_info(plays)")
+    # Get existing columns (table_xinfo also lists generated columns)
+    cursor = conn.execute("PRAGMA table_xinfo(plays)")
     existing_columns = {row[1] for row in cursor.fetchall()}
 
     # Add missing columns
@@ -77,18 +149,139 @@ def init_db():
             conn.execute(f"ALTER TABLE plays ADD COLUMN {col_name} {col_type}")
 
     # Create indexes
+    # Per-artist first-play/time-range lookups; also serves plain artist lookups
     conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_plays_timestamp ON plays(timestamp)
+        CREATE INDEX IF NOT EXISTS idx_plays_artist_ts ON plays(artist, timestamp)
     """)
     conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_plays_artist ON plays(artist)
+        CREATE INDEX IF NOT EXISTS idx_plays_genre ON plays(genre)
     """)
+    # Per-album unique-track counts; also serves plain album lookups
     conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_plays_genre ON plays(genre)
+        CREATE INDEX IF NOT EXISTS idx_plays_album_artist_title ON plays(album, artist, title)
+    """)
+    # Per-song grouping (unique song counts, first play of each song) reads
+    # plays already in GROUP BY title, artist order
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_plays_title_artist ON plays(title, artist, timestamp)
+    """)
+    # Superseded by the composite indexes above
+    conn.execute("DROP INDEX IF EXISTS idx_plays_artist")
+    conn.execute("DROP INDEX IF EXISTS idx_plays_album")
+    # Expression index so per-day grouping doesn't recompute DATE() per row.
+    # title, artist and timestamp make it covering for per-track-per-day
+    # counts, which then read plays already in GROUP BY order.
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_plays_date_track
+        ON plays(DATE(timestamp), title, artist, timestamp)
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_plays_date")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_plays_hour ON plays(hour_of_day)
+        WHERE hour_of_day IS NOT NULL
+    """)
+    # Covering index for the range-filtered analytics scans: every column
+    # they read lives in the index, so no table pages are touched
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_plays_cover ON plays(
+            timestamp, artist, title, album, track_number, played_ms, duration_ms
+        )
     """)
+    # The covering index leads with timestamp, so it serves every range scan
+    # and timestamp sort the plain index did; one fewer index per insert
+    conn.execute("DROP INDEX IF EXISTS idx_plays_timestamp")
+    # Partial index holding only skipped plays (under half the track). Its
+    # WHERE must match the skip predicate in analytics._MOST_SKIPPED_SQL
+    # term for term, or the planner will not consider it.
     conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_plays_album ON plays(album)
+        CREATE INDEX IF NOT EXISTS idx_plays_skip
+        ON plays(timestamp, title, artist, played_ms, duration_ms)
+        WHERE played_ms IS NOT NULL AND duration_ms IS NOT NULL AND duration_ms > 0
+          AND played_ms * 1.0 / duration_ms < 0.5
+    """)
+
+    # Per-day rollup of plays, kept current by triggers, so day-level
+    # analytics read one row per day instead of aggregating every play
+    cursor = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_stats'"
+    )
+    needs_backfill = cursor.fetchone() is None
+
+    columns = ", ".join(
+        f"{name} {_daily_stats_type(name)} NOT NULL DEFAULT 0" for name, _ in DAILY_STATS_COLUMNS
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS daily_stats (date TEXT PRIMARY KEY, {columns})")
+
+    # Older databases have a narrower daily_stats: add the missing counters,
+    # swap in triggers that maintain them and rebuild the rollup
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(daily_stats)")}
+    missing = [(name, expr) for name, expr in DAILY_STATS_COLUMNS if name not in existing]
+    for name, _ in missing:
+        conn.execute(
+            f"ALTER TABLE daily_stats ADD COLUMN {name} {_daily_stats_type(name)} NOT NULL DEFAULT 0"
+        )
+    if missing:
+        for trigger in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_plays_daily_{trigger}")
+
+    names = ", ".join(name for name, _ in DAILY_STATS_COLUMNS)
+    new_values = ", ".join(expr.format(row="NEW") for _, expr in DAILY_STATS_COLUMNS)
+    add_excluded = ",\n                ".join(
+        f"{name} = {name} + excluded.{name}" for name, _ in DAILY_STATS_COLUMNS
+    )
+    subtract_old = ",\n                ".join(
+        f"{name} = {name} - ({expr.format(row='OLD')})" for name, expr in DAILY_STATS_COLUMNS
+    )
+    upsert_new = f"""
+            INSERT INTO daily_stats (date, {names})
+            SELECT DATE(NEW.timestamp), {new_values}
+            WHERE DATE(NEW.timestamp) IS NOT NULL
+            ON CONFLICT(date) DO UPDATE SET
+                {add_excluded};
+    """
+    remove_old = f"""
+            UPDATE daily_stats SET
+                {subtract_old}
+            WHERE date = DATE(OLD.timestamp);
+            DELETE FROM daily_stats
+            WHERE date = DATE(OLD.timestamp) AND play_count <= 0;
+    """
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_plays_daily_insert
+        AFTER INSERT ON plays
+        WHEN DATE(NEW.timestamp) IS NOT NULL
+        BEGIN
+            {upsert_new}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_plays_daily_delete
+        AFTER DELETE ON plays
+        WHEN DATE(OLD.timestamp) IS NOT NULL
+        BEGIN
+            {remove_old}
+        END
     """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_plays_daily_update
+        AFTER UPDATE OF timestamp, played_ms, duration_ms ON plays
+        BEGIN
+            {remove_old}
+            {upsert_new}
+        END
+    """)
+
+    if needs_backfill or missing:
+        sums = ", ".join(f"SUM({expr.format(row='plays')})" for _, expr in DAILY_STATS_COLUMNS)
+        conn.execute("DELETE FROM daily_stats")
+        conn.execute(f"""
+            INSERT INTO daily_stats (date, {names})
+            SELECT DATE(timestamp), {sums}
+            FROM plays
+            WHERE DATE(timestamp) IS NOT NULL
+            GROUP BY DATE(timestamp)
+        """)
 
     # Create audio_features table
     conn.execute("""
@@ -114,6 +307,21 @@ def init_db():
         ON audio_features(analyzed_at)
     """)
 
+    # Give the planner statistics so it can choose between the composite
+    # indexes: ANALYZE plays until it has stats (an empty table records
+    # none), then leave refreshes to PRAGMA optimize
+    cursor = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    )
+    has_stats = (
+        cursor.fetchone() is not None
+        and conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = 'plays'").fetchone() is not None
+    )
+    if has_stats:
+        conn.execute("PRAGMA optimize")
+    else:
+        conn.execute("ANALYZE plays")
+
     conn.commit()
     conn.close()
 
@@ -271,33 +479,42 @@ def get_release_year_stats(
 
 def save_audio_features(file_path: str, features: dict):
     """Save audio features for a file to the database."""
+    save_audio_features_batch([(file_path, features)])
+
+
+def save_audio_features_batch(items: List[tuple]):
+    """Save audio features for many (file_path, features) pairs in one transaction."""
+    analyzed_at = datetime.now().isoformat()
     conn = get_connection()
-    conn.execute(
-        """
-        INSERT OR REPLACE INTO audio_features (
-            file_path, tempo, energy, danceability, valence,
-            acousticness, instrumentalness, speechiness, loudness,
-            key, mode, time_signature, analyzed_at
+    with conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO audio_features (
+                file_path, tempo, energy, danceability, valence,
+                acousticness, instrumentalness, speechiness, loudness,
+                key, mode, time_signature, analyzed_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    file_path,
+                    features.get('tempo'),
+                    features.get('energy'),
+                    features.get('danceability'),
+                    features.get('valence'),
+                    features.get('acousticness'),
+                    features.get('instrumentalness'),
+                    features.get('speechiness'),
+                    features.get('loudness'),
+                    features.get('key'),
+                    features.get('mode'),
+                    features.get('time_signature'),
+                    analyzed_at,
+                )
+                for file_path, features in items
+            ],
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            file_path,
-            features.get('tempo'),
-            features.get('energy'),
-            features.get('danceability'),
-            features.get('valence'),
-            features.get('acousticness'),
-            features.get('instrumentalness'),
-            features.get('speechiness'),
-            features.get('loudness'),
-            features.get('key'),
-            features.get('mode'),
-            features.get('time_signature'),
-            datetime.now().isoformat(),
-        ),
-    )
-    conn.commit()
     conn.close()
 
 
@@ -342,6 +559,23 @@ def is_file_analyzed(file_path: str) -> bool:
     return result
 
 
+def get_analyzed_files(file_paths: List[str]) -> set:
+    """Return the subset of file_paths that have already been analyzed."""
+    conn = get_connection()
+    analyzed = set()
+    # Chunked to stay under SQLite's bound-parameter limit
+    for i in range(0, len(file_paths), 500):
+        chunk = file_paths[i:i + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor = conn.execute(
+            f"SELECT file_path FROM audio_features WHERE file_path IN ({placeholders})",
+            chunk,
+        )
+        analyzed.update(row['file_path'] for row in cursor)
+    conn.close()
+    return analyzed
+
+
 def get_all_audio_features() -> List[dict]:
     """Get all audio features from the database."""
     conn = get_connection()
@@ -369,6 +603,41 @@ def get_all_audio_features() -> List[dict]:
     ]
 
 
+def get_audio_feature_summary() -> dict:
+    """Get aggregate statistics over all analyzed audio files.
+
+    Averages and the tempo range skip NULL and zero values. key_counts is
+    a list of (key, count) pairs, most common first; ties go to the key
+    that was analyzed first.
+    """
+    conn = get_connection()
+    row = conn.execute("""
+        SELECT
+            COUNT(*) AS total_files,
+            AVG(NULLIF(tempo, 0)) AS avg_tempo,
+            MIN(NULLIF(tempo, 0)) AS min_tempo,
+            MAX(NULLIF(tempo, 0)) AS max_tempo,
+            AVG(NULLIF(energy, 0)) AS avg_energy,
+            AVG(NULLIF(danceability, 0)) AS avg_danceability,
+            AVG(NULLIF(valence, 0)) AS avg_valence,
+            COUNT(*) FILTER (WHERE mode = 1) AS major_count,
+            COUNT(mode) - COUNT(*) FILTER (WHERE mode = 1) AS minor_count
+        FROM audio_features
+    """).fetchone()
+    key_counts = conn.execute("""
+        SELECT key, COUNT(*) AS count
+        FROM audio_features
+        WHERE key IS NOT NULL
+        GROUP BY key
+        ORDER BY count DESC, MIN(rowid)
+    """).fetchall()
+    conn.close()
+
+    summary = dict(row)
+    summary['key_counts'] = [(r['key'], r['count']) for r in key_counts]
+    return summary
+
+
 def delete_non_local_plays() -> int:
     """Delete ONLY explicitly non-local plays from the database.
 
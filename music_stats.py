@@ -70,15 +70,9 @@ def get_stats(start_date: datetime = None, end_date: datetime = None):
     """Calculate all statistics for the given date range."""
     conn = get_connection()
 
-    where_clause = "WHERE 1=1"
-    params = []
-
-    if start_date:
-        where_clause += " AND timestamp >= ?"
-        params.append(start_date.isoformat())
-    if end_date:
-        where_clause += " AND timestamp <= ?"
-        params.append(end_date.isoformat())
+    import db as db_module
+    where_clause = f"WHERE {db_module.TIME_RANGE}"
+    params = db_module.time_range_params(start_date, end_date)
 
     # Total stats (normalize "feat." variants and case for unique artist count)
     total = conn.execute(f"""